@@ -1,4 +1,5 @@
 import os
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 
@@ -16,6 +17,76 @@ class Settings(BaseSettings):
     naver_client_secret: str
     kakao_client_id: str
     kakao_client_secret: str
+    oauth_connect_timeout: float = 3.0  # seconds
+    oauth_read_timeout: float = 5.0  # seconds
+    oauth_retries: int = 2
+    oauth_max_connections: int = 10  # provider 별
+
+    # Auth
+    # 검증한 access token 을 exp 까지 기억해 둘 최대 개수
+    token_cache_size: int = 10000
+    # bcrypt 해시/검증을 실행할 스레드 수와 최대 대기 요청 수 (넘으면 503)
+    password_hash_workers: int = 2
+    password_hash_queue_size: int = 32
+
+    # Catalog
+    theme_catalog_enabled: bool = True
+    theme_catalog_refresh_interval: int = 600  # 10 minutes
+
+    # Search
+    search_enabled: bool = True
+    search_refresh_interval: int = 600  # 10 minutes
+
+    # Cache
+    list_cache_expire: int = 60  # 1 minute
+    detail_cache_expire: int = 3600  # 1 hour (리뷰 작성/수정/삭제 시 무효화)
+    saves_cache_expire: int = 3600  # 1 hour
+    # 만료 후 이 시간 동안은 이전 값을 반환하며 백그라운드에서 다시 계산한다
+    cache_stale_grace: int = 60  # 1 minute
+    cache_max_bytes: int = 64 * 1024 * 1024  # 64MB
+    # 워커/태스크가 공유하는 Redis (없으면 프로세스 내 캐시만 사용)
+    redis_url: str = ""
+    cache_l1_expire: int = 10  # 10 seconds
+    # /cache/invalidate 에 X-Admin-Token 헤더로 보내야 하는 값 (비어 있으면 사용할 수 없다)
+    cache_admin_token: str = ""
+    # 네임스페이스별 최대 바이트 (없는 네임스페이스는 cache_max_bytes 까지)
+    cache_namespace_quotas: Dict[str, int] = {
+        "themes": 16 * 1024 * 1024,
+        "cafes": 8 * 1024 * 1024,
+        "theme": 16 * 1024 * 1024,
+        "cafe": 8 * 1024 * 1024,
+        "saves": 8 * 1024 * 1024,
+        "genre": 4 * 1024 * 1024,
+    }
+
+    # View counter
+    view_flush_interval: int = 10  # 10 seconds
+    view_flush_size: int = 1000
+
+    # Recommend
+    recommend_min_view: int = 100
+    recommend_size: int = 8
+    recommend_refresh_interval: int = 600  # 10 minutes
+    recommend_cf_refresh_interval: int = 3600  # 1 hour
+    recommend_cf_neighbours: int = 50
+
+    # Sitemap
+    sitemap_refresh_interval: int = 3600  # 1 hour
+    sitemap_shard_size: int = 50000
+
+    # Images
+    s3_bucket: str = "escapenote-images"
+    # S3 호환 저장소(로컬 테스트 등)를 쓸 때만 설정한다
+    s3_endpoint_url: str = ""
+    s3_upload_workers: int = 4
+    s3_multipart_threshold: int = 8 * 1024 * 1024  # 8MB
+    s3_multipart_chunksize: int = 8 * 1024 * 1024  # 8MB
+    # 업로드 이미지를 변환할 프로세스 수와 만들 너비들
+    image_workers: int = 2
+    image_widths: List[int] = [64, 160, 320, 640]
+    image_jpeg_quality: int = 85
+    image_webp_quality: int = 80
+    image_max_bytes: int = 20 * 1024 * 1024  # 20MB
 
     # URLs
     domain: str = ".escape-note.com"
@@ -1,13 +1,24 @@
-from fastapi import FastAPI
+import hmac
+
+from fastapi import FastAPI, Header, HTTPException, status
 from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi_cache import FastAPICache
-from fastapi_cache.backends.inmemory import InMemoryBackend
 
 from app.prisma import prisma
 from app.config import settings
+from app.models.cache import InvalidateCache
 from app.routers import routers
+from app.services import images as images_service
+from app.services import oauth as oauth_service
+from app.services import recommend as recommend_service
+from app.services import search as search_service
+from app.services.sitemaps import sitemap_store
+from app.services.theme_catalog import theme_catalog
+from app.services.view_counter import cafe_views, theme_views
+from app.utils import cache
+from app.utils.etag import ETagMiddleware
+from app.utils.metrics import metrics
 
 if settings.app_env == "production":
     app = FastAPI(
@@ -40,30 +51,141 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Conditional GET (ETag / 304). GZip 보다 먼저 등록해 GZip 안쪽에서 동작한다
+app.add_middleware(ETagMiddleware)
+
 # Compression
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 # Init Fastapi Cache
 @app.on_event("startup")
 async def startup():
-    FastAPICache.init(InMemoryBackend(), prefix="escapenote-api-cache")
+    await cache.init()
 
 
-# Flush Fastapi Cache
-@app.get("/cache/flush/{namespace}", tags=["CACHE"])
-async def clear_caches(namespace: str):
+# Fastapi Cache shutdown
+@app.on_event("shutdown")
+async def shutdown():
+    await cache.close()
+
+
+# Invalidate Fastapi Cache (theme:ID, cafe:ID, genre:ID, themes:list, cafes:list, faq, sitemaps)
+@app.post("/cache/invalidate", tags=["CACHE"])
+async def invalidate_caches(
+    body: InvalidateCache,
+    x_admin_token: str = Header(default=""),
+):
+    if not settings.cache_admin_token or not hmac.compare_digest(
+        x_admin_token.encode(), settings.cache_admin_token.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="권한이 없습니다.",
+        )
     return {
-        "namespace": namespace,
-        "status": await FastAPICache.clear(namespace=namespace),
+        "tags": body.tags,
+        "count": await cache.invalidate(*body.tags),
     }
 
 
+# Metrics
+@app.get("/metrics", tags=["METRICS"])
+async def get_metrics():
+    return metrics.snapshot()
+
+
 # Prisma startup
 @app.on_event("startup")
 async def startup():
     await prisma.connect()
 
 
+# OAuth client startup
+@app.on_event("startup")
+async def startup():
+    await oauth_service.start()
+
+
+# OAuth client shutdown
+@app.on_event("shutdown")
+async def shutdown():
+    await oauth_service.stop()
+
+
+# S3 client, image process pool startup
+@app.on_event("startup")
+async def startup():
+    await images_service.start()
+
+
+# S3 client, image process pool shutdown (진행 중인 업로드를 마친다)
+@app.on_event("shutdown")
+async def shutdown():
+    await images_service.stop()
+
+
+# Theme catalog startup
+@app.on_event("startup")
+async def startup():
+    await theme_catalog.start()
+
+
+# Theme catalog shutdown
+@app.on_event("shutdown")
+async def shutdown():
+    await theme_catalog.stop()
+
+
+# Search index startup
+@app.on_event("startup")
+async def startup():
+    await search_service.start()
+
+
+# Search index shutdown
+@app.on_event("shutdown")
+async def shutdown():
+    await search_service.stop()
+
+
+# Recommend pool startup
+@app.on_event("startup")
+async def startup():
+    await recommend_service.start()
+
+
+# Recommend pool shutdown
+@app.on_event("shutdown")
+async def shutdown():
+    await recommend_service.stop()
+
+
+# Sitemap startup
+@app.on_event("startup")
+async def startup():
+    await sitemap_store.start()
+
+
+# Sitemap shutdown
+@app.on_event("shutdown")
+async def shutdown():
+    await sitemap_store.stop()
+
+
+# View counter startup
+@app.on_event("startup")
+async def startup():
+    await theme_views.start()
+    await cafe_views.start()
+
+
+# View counter shutdown (남은 조회수 반영)
+@app.on_event("shutdown")
+async def shutdown():
+    await theme_views.stop()
+    await cafe_views.stop()
+
+
 # Prisma shutdown
 @app.on_event("shutdown")
 async def shutdown():
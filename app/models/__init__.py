@@ -5,3 +5,5 @@ from pydantic import BaseModel
 class PageInfo(BaseModel):
     startCursor: Optional[str]
     endCursor: Optional[str]
+    hasPreviousPage: bool = False
+    hasNextPage: bool = False
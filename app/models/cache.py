@@ -0,0 +1,6 @@
+from typing import List
+from pydantic import BaseModel
+
+
+class InvalidateCache(BaseModel):
+    tags: List[str]
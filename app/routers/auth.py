@@ -1,4 +1,3 @@
-import requests
 from typing import Optional
 from fastapi import APIRouter, Cookie, Response
 from fastapi import Depends, HTTPException, status
@@ -22,6 +21,7 @@ from app.models.auth import (
 )
 from app.models.user import User
 from app.services import auth as auth_service
+from app.services import oauth as oauth_service
 from app.utils import auth as auth_utils
 
 router = APIRouter(
@@ -127,7 +127,8 @@ async def login_by_email(res: Response, body: LoginByEmaileDto):
 async def login_google():
     client_id = settings.google_client_id
     redirect_uri = f"{settings.backend_url}/auth/callback/google"
-    scope = "email%20profile"
+    # openid 를 요청해야 토큰 응답에 id_token 이 포함된다
+    scope = "openid%20email%20profile"
     url = f"https://accounts.google.com/o/oauth2/v2/auth?client_id={client_id}&redirect_uri={redirect_uri}&response_type=code&scope={scope}"
     return RedirectResponse(url)
 
@@ -135,42 +136,10 @@ async def login_google():
 @router.get("/callback/google")
 async def login_google_callback(code: str):
     provider = "google"
-    client_id = settings.google_client_id
-    client_secret = settings.google_client_secret
-    redirect_uri = f"{settings.backend_url}/auth/callback/google"
-
-    # Access Token을 받아옴
-    data = {
-        "code": code,
-        "client_id": client_id,
-        "client_secret": client_secret,
-        "redirect_uri": redirect_uri,
-        "grant_type": "authorization_code",
-    }
-    token_res = requests.post("https://oauth2.googleapis.com/token", data=data)
-    token_json = token_res.json()
-    access_token = token_json.get("access_token")
-
-    # Access Token을 사용하여 사용자 정보를 받아옴
-    if access_token:
-        profile_res = requests.get(
-            "https://www.googleapis.com/oauth2/v3/userinfo",
-            headers={"Authorization": f"Bearer {access_token}"},
-        )
-        profile_json = profile_res.json()
-        email = profile_json["email"]
-
-        user = await prisma.user.find_first(where={"email": email})
-        if user:
-            res = RedirectResponse(settings.front_main_url)
-            await auth_service.login_by_social(res, provider, email)
-            return res
-        else:
-            res = RedirectResponse(settings.front_signup_url)
-            await auth_service.pre_signup_by_social(res, provider, email)
-            return res
-    else:
+    email = await oauth_service.get_google_email(code)
+    if not email:
         return {"error": "Could not authenticate"}
+    return await _login_by_social(provider, email)
 
 
 @router.get("/login/naver")
@@ -184,38 +153,8 @@ async def login_naver():
 @router.get("/callback/naver")
 async def login_naver_callback(code: str, state: str):
     provider = "naver"
-    client_id = settings.naver_client_id
-    client_secret = settings.naver_client_secret
-    redirect_uri = f"{settings.backend_url}/auth/callback/naver"
-    api_url = f"https://nid.naver.com/oauth2.0/token?grant_type=authorization_code&client_id={client_id}&client_secret={client_secret}&redirect_uri={redirect_uri}&code={code}&state={state}"
-
-    token_res = requests.get(
-        api_url,
-        headers={
-            "X-Naver-Client-Id": client_id,
-            "X-Naver-Client-Secret": client_secret,
-        },
-    )
-    token_json = token_res.json()
-    access_token = token_json.get("access_token")
-
-    profile_res = requests.get(
-        "https://openapi.naver.com/v1/nid/me",
-        headers={"Authorization": f"Bearer {access_token}"},
-    )
-    profile_json = profile_res.json()
-    profile = profile_json["response"]
-    email = profile["email"]
-
-    user = await prisma.user.find_first(where={"email": email})
-    if user:
-        res = RedirectResponse(settings.front_main_url)
-        await auth_service.login_by_social(res, provider, email)
-        return res
-    else:
-        res = RedirectResponse(settings.front_signup_url)
-        await auth_service.pre_signup_by_social(res, provider, email)
-        return res
+    email = await oauth_service.get_naver_email(code, state)
+    return await _login_by_social(provider, email)
 
 
 @router.get("/login/kakao")
@@ -229,35 +168,11 @@ async def login_kakao():
 @router.get("/callback/kakao")
 async def login_kakao_callback(code: str):
     provider = "kakao"
-    client_id = settings.kakao_client_id
-    client_secret = settings.kakao_client_secret
-    redirect_uri = f"{settings.backend_url}/auth/callback/kakao"
-    api_url = "https://kauth.kakao.com/oauth/token"
-
-    token_res = requests.post(
-        api_url,
-        headers={
-            "Content-Type": "application/x-www-form-urlencoded",
-        },
-        data={
-            "grant_type": "authorization_code",
-            "client_id": client_id,
-            "client_secret": client_secret,
-            "redirect_uri": redirect_uri,
-            "code": code,
-        },
-    )
-    token_json = token_res.json()
-    access_token = token_json.get("access_token")
+    email = await oauth_service.get_kakao_email(code)
+    return await _login_by_social(provider, email)
 
-    profile_res = requests.post(
-        "https://kapi.kakao.com/v2/user/me",
-        headers={"Authorization": f"Bearer {access_token}"},
-    )
-    profile_json = profile_res.json()
-    kakao_account = profile_json.get("kakao_account")
-    email = kakao_account["email"]
 
+async def _login_by_social(provider: str, email: str):
     user = await prisma.user.find_first(where={"email": email})
     if user:
         res = RedirectResponse(settings.front_main_url)
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends
 from app.prisma import prisma
 from app.models.auth import AccessUser
 from app.models.cafe_reviews import UpdateCafeReview
-from app.utils.find_many_cursor import find_many_cursor
+from app.utils.keyset import find_many_keyset
 from app.services import auth as auth_service
 from app.services import cafe_reviews as cafe_reviews_service
 
@@ -21,12 +21,12 @@ async def get_reviews(
     nickname: str,
     take: Optional[int] = 20,
     cursor: Optional[str] = None,
+    direction: Optional[str] = "next",
 ):
     """
     카페 리뷰 리스트 조회
     """
     options = {
-        "take": take + 1,
         "where": {
             "user": {
                 "nickname": nickname,
@@ -36,13 +36,17 @@ async def get_reviews(
             "cafe": True,
             "user": True,
         },
-        "order": {"createdAt": "desc"},
     }
-    if cursor:
-        options["cursor"] = {"id": cursor}
 
-    cafereviews = await prisma.cafereview.find_many(**options)
-    result = find_many_cursor(cafereviews, take=take, cursor=cursor)
+    result = await find_many_keyset(
+        prisma.cafereview,
+        options,
+        sort="createdAt",
+        order="desc",
+        take=take,
+        cursor=cursor,
+        direction=direction,
+    )
     return result
 
 
@@ -74,18 +78,24 @@ async def update_review(
     카페 리뷰 수정
     """
     try:
-        await prisma.cafereview.update_many(
-            where={
-                "id": id,
-                "userId": current_user.id,
-            },
-            data={
-                "rating": body.rating,
-                "text": body.text,
-            },
-        )
+        async with prisma.tx() as tx:
+            review = await cafe_reviews_service.find_review_for_update(
+                tx, id, current_user.id
+            )
+            if review:
+                updated = await tx.cafereview.update(
+                    where={"id": id},
+                    data={
+                        "rating": body.rating,
+                        "text": body.text,
+                    },
+                )
+                await cafe_reviews_service.apply_review_delta(
+                    tx, review.cafeId, review, updated
+                )
 
-        await cafe_reviews_service.update_cafe_review(cafeId)
+        if review:
+            await cafe_reviews_service.sync_cafe_review(review.cafeId)
 
         return True
     except:
@@ -101,11 +111,15 @@ async def delete_review(
     """
     카페 리뷰 삭제
     """
-    await prisma.cafereview.delete_many(
-        where={
-            "id": id,
-            "userId": current_user.id,
-        },
-    )
+    async with prisma.tx() as tx:
+        review = await cafe_reviews_service.find_review_for_update(
+            tx, id, current_user.id
+        )
+        if review:
+            await tx.cafereview.delete(where={"id": id})
+            await cafe_reviews_service.apply_review_delta(
+                tx, review.cafeId, review, None
+            )
 
-    await cafe_reviews_service.update_cafe_review(cafeId)
+    if review:
+        await cafe_reviews_service.sync_cafe_review(review.cafeId)
@@ -1,13 +1,21 @@
-from prisma import types
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Header, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 
 from app.prisma import prisma
+from app.config import settings
 from app.models.auth import AccessUser
 from app.models.cafe import CreateCafeReview
-from app.utils.find_many_cursor import find_many_cursor
+from app.utils import cache
+from app.utils.etag import version_etag
+from app.utils.keyset import find_many_keyset
+from app.utils.projection import parse_projection
 from app.services import auth as auth_service
+from app.services import cache_tags
+from app.services import cafe_list as cafe_list_service
 from app.services import cafe_reviews as cafe_reviews_service
+from app.services import details as details_service
+from app.services import saves as saves_service
+from app.services.view_counter import cafe_views
 
 
 router = APIRouter(
@@ -16,6 +24,8 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+CAFE_PAGE_TAGS = cache_tags.page_tags(cache_tags.cafe_tags, cache_tags.CAFE_LIST)
+
 
 @router.get("")
 async def get_cafes(
@@ -24,67 +34,91 @@ async def get_cafes(
     areaB: Optional[str] = None,
     take: Optional[int] = 20,
     cursor: Optional[str] = None,
-    sort: Optional[str] = "createdAt",
+    direction: Optional[str] = "next",
+    sort: Optional[str] = None,
     order: Optional[str] = "desc",
-    authorization: str = Header(default=""),
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    current_user: Optional[AccessUser] = Depends(auth_service.get_optional_user),
 ):
-    current_user = None
-    if authorization:
-        token = authorization.replace("Bearer ", "")
-        current_user = await auth_service.get_current_user(token)
-
-    options: types.FindManyCafeArgsFromCafe = {
-        "take": take + 1,
-        "where": {"status": "PUBLISHED"},
-        "include": {"themes": True},
-        "order": {sort: order},
+    # 로그인 여부와 상관없이 익명 결과를 공유 캐시에서 읽고, 저장 여부만 덧붙인다
+    params = {
+        "term": term,
+        "areaA": areaA,
+        "areaB": areaB,
+        "take": take,
+        "cursor": cursor,
+        "direction": direction,
+        "sort": sort,
+        "order": order,
+        "fields": fields,
+        "include": include,
     }
-    if term:
-        options["where"]["name"] = {"contains": term}
-    if areaA:
-        options["where"]["areaA"] = areaA
-    if areaB:
-        options["where"]["areaB"] = areaB
-    if cursor:
-        options["cursor"] = {"id": cursor}
-    if current_user:
-        options["include"]["saves"] = {
-            "where": {"userId": current_user.id},
-        }
+    key = cache.cache_key("cafes", **params)
+    if not current_user:
+        # 익명 응답은 캐시된 bytes 와 ETag 를 그대로 내려준다
+        etag, data = await cache.get_or_set_entry(
+            key,
+            settings.list_cache_expire,
+            lambda: cafe_list_service.find_cafes(**params),
+            tags=CAFE_PAGE_TAGS,
+        )
+        return Response(
+            content=data, media_type="application/json", headers={"ETag": etag}
+        )
 
-    cafes = await prisma.cafe.find_many(**options)
-    result = find_many_cursor(cafes, take=take, cursor=cursor)
+    result = await cache.get_or_set(
+        key,
+        settings.list_cache_expire,
+        lambda: cafe_list_service.find_cafes(**params),
+        tags=CAFE_PAGE_TAGS,
+    )
+    saves = await saves_service.get_cafe_saves(current_user.id)
+    saves_service.overlay_many(result["items"], saves)
     return result
 
 
 @router.get("/{id}")
 async def get_cafe_detail(
     id: str,
-    authorization: str = Header(default=""),
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    current_user: Optional[AccessUser] = Depends(auth_service.get_optional_user),
 ):
-    current_user = None
-    if authorization:
-        token = authorization.replace("Bearer ", "")
-        current_user = await auth_service.get_current_user(token)
-
-    options = {
-        "where": {"id": id},
-        "include": {
-            "themes": True,
-        },
-    }
-    if current_user:
-        options["include"]["saves"] = {
-            "where": {"userId": current_user.id},
+    async def find_cafe():
+        options = {
+            "where": {"id": id},
+            "include": {
+                "themes": True,
+            },
         }
-
-    cafe = await prisma.cafe.find_unique(**options)
-
-    await prisma.cafe.update(
-        where={"id": id},
-        data={"view": {"increment": 1}},
+        projection = parse_projection(
+            "Cafe", fields, include, default_include=("themes",)
+        )
+        if projection:
+            options["include"] = projection.include()
+
+        actions = projection.actions(prisma) if projection else prisma.cafe
+        return await actions.find_unique(**options)
+
+    # 직렬화된 bytes 를 그대로 내려주고, 로그인 사용자는 저장 여부만 덧붙인다
+    etag, data = await cache.get_or_set_entry(
+        details_service.cafe_key(id, fields=fields, include=include),
+        settings.detail_cache_expire,
+        find_cafe,
+        tags=lambda cafe: {cache_tags.cafe_tag(id)} | cache_tags.cafe_tags(cafe),
+    )
+    if current_user:
+        saves = await saves_service.get_cafe_saves(current_user.id)
+        save = saves.get(id)
+        data = cache.merge(data, saves=[save] if save else [])
+        etag = version_etag(etag, save["id"] if save else "")
+
+    if data != b"null":
+        cafe_views.add(id)
+    return Response(
+        content=data, media_type="application/json", headers={"ETag": etag}
     )
-    return cafe
 
 
 @router.post("/{id}/save", response_model=bool)
@@ -102,6 +136,7 @@ async def save_cafe(
                 "user": {"connect": {"id": current_user.id}},
             }
         )
+        await saves_service.invalidate_cafe_saves(current_user.id)
         return True
     return False
 
@@ -116,6 +151,7 @@ async def unsave_cafe(
     )
     if cafe_save:
         await prisma.cafesave.delete(where={"id": cafe_save.id})
+        await saves_service.invalidate_cafe_saves(current_user.id)
         return True
     return False
 
@@ -125,20 +161,24 @@ async def get_cafe_reviews(
     id: str,
     take: Optional[int] = 10,
     cursor: Optional[str] = None,
+    direction: Optional[str] = "next",
 ):
     options = {
-        "take": take + 1,
         "where": {"cafeId": id},
         "include": {
             "user": True,
         },
-        "order": {"createdAt": "desc"},
     }
-    if cursor:
-        options["cursor"] = {"id": cursor}
 
-    reviews = await prisma.cafereview.find_many(**options)
-    result = find_many_cursor(reviews, take=take, cursor=cursor)
+    result = await find_many_keyset(
+        prisma.cafereview,
+        options,
+        sort="createdAt",
+        order="desc",
+        take=take,
+        cursor=cursor,
+        direction=direction,
+    )
     return result
 
 
@@ -158,15 +198,17 @@ async def write_review_on_cafe(
         )
 
     try:
-        await prisma.cafereview.create(
-            data={
-                "cafe": {"connect": {"id": id}},
-                "rating": body.rating,
-                "text": body.text,
-                "user": {"connect": {"id": current_user.id}},
-            }
-        )
-        await cafe_reviews_service.update_cafe_review(id)
+        async with prisma.tx() as tx:
+            review = await tx.cafereview.create(
+                data={
+                    "cafe": {"connect": {"id": id}},
+                    "rating": body.rating,
+                    "text": body.text,
+                    "user": {"connect": {"id": current_user.id}},
+                }
+            )
+            await cafe_reviews_service.apply_review_delta(tx, id, None, review)
+        await cafe_reviews_service.sync_cafe_review(id)
         return True
     except:
         raise HTTPException(
@@ -180,15 +222,19 @@ async def get_cafe_blog_reviews(
     id: str,
     take: Optional[int] = 10,
     cursor: Optional[str] = None,
+    direction: Optional[str] = "next",
 ):
     options = {
-        "take": take + 1,
         "where": {"cafeId": id},
-        "order": {"createdAt": "desc"},
     }
-    if cursor:
-        options["cursor"] = {"id": cursor}
 
-    reviews = await prisma.blogreview.find_many(**options)
-    result = find_many_cursor(reviews, take=take, cursor=cursor)
+    result = await find_many_keyset(
+        prisma.blogreview,
+        options,
+        sort="createdAt",
+        order="desc",
+        take=take,
+        cursor=cursor,
+        direction=direction,
+    )
     return result
@@ -3,6 +3,9 @@ from prisma import types
 from fastapi import APIRouter
 
 from app.prisma import prisma
+from app.utils import cache
+from app.services import cache_tags
+from app.services import search as search_service
 
 
 router = APIRouter(
@@ -15,15 +18,32 @@ router = APIRouter(
 @router.get("")
 async def get_faq_list(
     term: Optional[str] = None,
-    sort: Optional[str] = "position",
+    sort: Optional[str] = None,
     order: Optional[str] = "asc",
 ):
-    options: types.FindManyFaqArgsFromFaq = {
-        "where": {"status": "PUBLISHED"},
-        "order": {sort: order},
-    }
-    if term:
-        options["where"]["question"] = {"contains": term}
-
-    faq_list = await prisma.faq.find_many(**options)
-    return faq_list
+    # 검색어가 있으면 기본 정렬은 검색 정확도순
+    sort = sort or ("relevance" if term else "position")
+
+    async def find_faq_list():
+        options: types.FindManyFaqArgsFromFaq = {
+            "where": {"status": "PUBLISHED"},
+            "order": {"position" if sort == "relevance" else sort: order},
+        }
+        ranking = None
+        if term and search_service.faq_index.ready:
+            ranking = search_service.faq_index.search(term)
+            options["where"]["id"] = {"in": [id for id, _ in ranking]}
+        elif term:
+            options["where"]["question"] = {"contains": term}
+
+        faq_list = await prisma.faq.find_many(**options)
+        if ranking is not None and sort == "relevance":
+            faq_list = search_service.order_by_ranking(faq_list, ranking)
+        return faq_list
+
+    return await cache.get_or_set(
+        cache.cache_key("faq", term=term, sort=sort, order=order),
+        3600,  # 1시간
+        find_faq_list,
+        tags=lambda _: [cache_tags.FAQ],
+    )
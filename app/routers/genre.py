@@ -1,9 +1,12 @@
 from prisma import types
 from typing import Optional
 from fastapi import APIRouter
-from fastapi_cache.decorator import cache
 
 from app.prisma import prisma
+from app.utils import cache
+from app.services import cache_tags
+from app.services import theme_list as theme_list_service
+from app.services.theme_catalog import theme_catalog
 
 
 router = APIRouter(
@@ -14,15 +17,76 @@ router = APIRouter(
 
 
 @router.get("")
-@cache(expire=3600)  # 1시간
-async def get_genreList(term: Optional[str] = None):
-    options: types.FindManyGenreArgsFromGenre = {
-        "where": {},
-        "include": {"themes": True},
-        "order": {"id": "asc"},
-    }
-    if term:
-        options["where"]["id"] = {"contains": term}
-
-    genre_list = await prisma.genre.find_many(**options)
-    return genre_list
+async def get_genreList(term: Optional[str] = None, compact: bool = False):
+    """
+    compact=true 이면 테마 목록 없이 장르 id 와 공개 테마 수만 반환한다.
+    """
+    if compact:
+        # ETag 는 ETagMiddleware 가 응답 본문(장르별 테마 수)으로 계산한다
+        return await _get_genre_counts(term)
+
+    async def find_genre_list():
+        options: types.FindManyGenreArgsFromGenre = {
+            "where": {},
+            "include": {"themes": True},
+            "order": {"id": "asc"},
+        }
+        if term:
+            options["where"]["id"] = {"contains": term}
+
+        return await prisma.genre.find_many(**options)
+
+    return await cache.get_or_set(
+        cache.cache_key("genre", term=term),
+        3600,  # 1시간
+        find_genre_list,
+        tags=cache_tags.genre_tags,
+    )
+
+
+async def _get_genre_counts(term: Optional[str] = None):
+    counts = theme_catalog.facet_counts("genre")
+    if counts is None:
+        rows = await prisma.query_raw(
+            """
+            SELECT z.A AS id, COUNT(*) AS count
+            FROM _GenreToTheme as z
+            JOIN themes as t
+            ON t.id = z.B
+            WHERE t.status = 'PUBLISHED'
+            GROUP BY z.A
+            """
+        )
+        counts = {row["id"]: int(row["count"]) for row in rows}
+
+    return [
+        {"id": id, "count": counts[id]}
+        for id in sorted(counts)
+        if not term or term in id
+    ]
+
+
+@router.get("/{id}/themes")
+async def get_genre_themes(
+    id: str,
+    take: Optional[int] = 20,
+    cursor: Optional[str] = None,
+    direction: Optional[str] = "next",
+    sort: Optional[str] = None,
+    order: Optional[str] = "desc",
+    fields: Optional[str] = "card",
+    include: Optional[str] = None,
+):
+    """
+    장르 하나의 테마 목록 (키셋 페이지)
+    """
+    return await theme_list_service.find_themes(
+        genre=id,
+        take=take,
+        cursor=cursor,
+        direction=direction,
+        sort=sort,
+        order=order,
+        fields=fields,
+        include=include,
+    )
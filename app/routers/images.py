@@ -1,7 +1,11 @@
-import uuid
-import boto3
-from fastapi import APIRouter, File, UploadFile
+import logging
+import os
+from fastapi import APIRouter, File, HTTPException, UploadFile, status
 
+from app.config import settings
+from app.services import images as images_service
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/images",
@@ -14,27 +18,35 @@ router = APIRouter(
 async def upload_image(file: UploadFile = File(None)):
     """
     사용자 이미지 업로드
+
+    너비별 WebP/JPEG 로 변환해 원본과 함께 올리고, url 에는 가장 큰 JPEG 를,
+    variants 에는 포맷 -> 너비 -> URL (original 에는 원본 URL) 을 담아 반환한다.
     """
-    ### AWS 세팅
-    session = boto3.Session()
-    s3 = session.resource("s3")
-    bucket_name = "escapenote-images"
-    folder_name = "users"
-    bucket = s3.Bucket(bucket_name)
+    if file is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="업로드할 이미지가 없습니다.",
+        )
+
+    # 본문을 읽지 않고 업로드 spool 에서 크기만 확인한다
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    if size > settings.image_max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="이미지 용량이 너무 큽니다.",
+        )
 
     try:
-        filename = uuid.uuid1()
-        type = "jpeg"
-        key = f"{folder_name}/{filename}.{type}"
-        bucket.upload_fileobj(
-            file.file,
-            key,
-            ExtraArgs={
-                "ContentType": f"image/{type}",
-                "CacheControl": "max-age=172800",
-            },
+        variants = await images_service.store_user_image(
+            file.file, size, file.content_type
         )
-        return {"url": f"/{key}"}
+    except HTTPException:
+        raise
     except Exception as e:
-        print("error", e)
+        logger.warning("image upload failed: %s", e)
         return None
+
+    jpeg = variants["jpeg"]
+    return {"url": jpeg[max(jpeg, key=int)], "variants": variants}
@@ -1,7 +1,12 @@
-from fastapi import APIRouter
-from fastapi_cache.decorator import cache
+from typing import Optional
+from fastapi import APIRouter, Depends
 
-from app.prisma import prisma
+from app.config import settings
+from app.models.auth import AccessUser
+from app.services import auth as auth_service
+from app.services import recommend as recommend_service
+from app.services.collaborative import cafe_cf
+from app.services.recommend import cafe_pool
 
 router = APIRouter(
     prefix="/recommend-cafes",
@@ -11,17 +16,14 @@ router = APIRouter(
 
 
 @router.get("")
-@cache(expire=86400)  # 24시간
-async def get_recommend_cafes():
-    cafes = await prisma.query_raw(
-        f"""
-            SELECT c.*
-            FROM cafes as c
-            WHERE c.view >= 100
-            AND c.status = 'PUBLISHED'
-            ORDER BY RAND()
-            LIMIT 8
-        """,
-    )
+async def get_recommend_cafes(
+    current_user: Optional[AccessUser] = Depends(auth_service.get_optional_user),
+):
+    # 로그인 사용자는 저장/리뷰 기록 기반으로 추천한다
+    if current_user:
+        return await recommend_service.personalize(
+            cafe_cf, cafe_pool, current_user.id, settings.recommend_size
+        )
 
-    return cafes
+    # 미리 적재한 후보(조회수 100 이상)에서 요청마다 무작위로 뽑는다
+    return await cafe_pool.sample(settings.recommend_size)
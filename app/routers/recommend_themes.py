@@ -1,8 +1,12 @@
-from prisma import models
-from fastapi import APIRouter
-from fastapi_cache.decorator import cache
+from typing import Optional
+from fastapi import APIRouter, Depends
 
-from app.prisma import prisma
+from app.config import settings
+from app.models.auth import AccessUser
+from app.services import auth as auth_service
+from app.services import recommend as recommend_service
+from app.services.collaborative import theme_cf
+from app.services.recommend import theme_pool
 
 
 router = APIRouter(
@@ -13,51 +17,14 @@ router = APIRouter(
 
 
 @router.get("")
-@cache(expire=86400)  # 24시간
-async def get_recommend_themes():
-    themes = await prisma.query_raw(
-        f"""
-            SELECT t.*
-            FROM themes as t
-            WHERE t.view >= 100
-            AND t.status = 'PUBLISHED'
-            ORDER BY RAND()
-            LIMIT 8
-        """,
-        model=models.Theme,
-    )
-
-    # 테마에 소속된 카페 추가
-    cafes_ids = list(map(lambda x: f"'{x.cafeId}'", themes))
-    cafes_ids_str = ",".join(cafes_ids)
-    cafes = await prisma.query_raw(
-        f"""
-        SELECT c.*
-            FROM cafes as c
-            WHERE c.id IN ({cafes_ids_str})
-        """,
-    )
-    for theme in themes:
-        for cafe in cafes:
-            if cafe["id"] == theme.cafeId:
-                theme.cafe = cafe
-
-    # 테마에 소속된 장르 추가
-    themes_ids = list(map(lambda x: f"'{x.id}'", themes))
-    themes_ids_str = ",".join(themes_ids)
-    genre_list = await prisma.query_raw(
-        f"""
-        SELECT z.*, g.*
-        FROM _GenreToTheme as z
-        LEFT JOIN genre as g
-        ON g.id = z.A
-        WHERE z.B IN ({themes_ids_str})
-        """,
-    )
-    for theme in themes:
-        theme.genre = list()
-        for genre in genre_list:
-            if genre["B"] == theme.id:
-                theme.genre.append(genre)
-
-    return themes
+async def get_recommend_themes(
+    current_user: Optional[AccessUser] = Depends(auth_service.get_optional_user),
+):
+    # 로그인 사용자는 저장/리뷰 기록 기반으로 추천한다
+    if current_user:
+        return await recommend_service.personalize(
+            theme_cf, theme_pool, current_user.id, settings.recommend_size
+        )
+
+    # 미리 적재한 후보(조회수 100 이상)에서 요청마다 무작위로 뽑는다
+    return await theme_pool.sample(settings.recommend_size)
@@ -1,7 +1,16 @@
-from fastapi import APIRouter
-from fastapi_cache.decorator import cache
+import gzip
+from email.utils import format_datetime
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Header, HTTPException, Request, Response, status
 
 from app.prisma import prisma
+from app.config import settings
+from app.utils import cache
+from app.utils.etag import is_fresh
+from app.utils.projection import Projection
+from app.services import cache_tags
+from app.services.sitemaps import sitemap_store
 
 
 router = APIRouter(
@@ -12,38 +21,125 @@ router = APIRouter(
 
 
 @router.get("/cafes")
-@cache(expire=86400)  # 24시간
 async def get_cafes():
-    cafes = await prisma.cafe.find_many(
-        where={"status": "PUBLISHED"},
-        order={"createdAt": "desc"},
-    )
-    cafes = list(
-        map(
-            lambda x: {
-                "id": x.id,
-                "updatedAt": x.updatedAt,
-            },
-            cafes,
+    async def find_cafes():
+        # id, updatedAt 컬럼만 조회한다
+        cafes = await Projection("Cafe", ("id", "updatedAt")).actions(prisma).find_many(
+            where={"status": "PUBLISHED"},
+            order={"createdAt": "desc"},
         )
+        return list(
+            map(
+                lambda x: {
+                    "id": x.id,
+                    "updatedAt": x.updatedAt,
+                },
+                cafes,
+            )
+        )
+
+    # 24시간 캐시, 만료 후 1시간 동안은 이전 값을 주면서 한 번만 다시 조회한다
+    return await cache.get_or_set(
+        cache.cache_key("sitemaps", kind="cafes"),
+        86400,
+        find_cafes,
+        stale=3600,
+        tags=lambda _: [cache_tags.SITEMAPS],
     )
-    return cafes
 
 
 @router.get("/themes")
-@cache(expire=86400)  # 24시간
 async def get_themes():
-    themes = await prisma.theme.find_many(
-        where={"status": "PUBLISHED"},
-        order={"createdAt": "desc"},
-    )
-    themes = list(
-        map(
-            lambda x: {
-                "id": x.id,
-                "updatedAt": x.updatedAt,
-            },
-            themes,
+    async def find_themes():
+        # id, updatedAt 컬럼만 조회한다
+        themes = await Projection("Theme", ("id", "updatedAt")).actions(prisma).find_many(
+            where={"status": "PUBLISHED"},
+            order={"createdAt": "desc"},
+        )
+        return list(
+            map(
+                lambda x: {
+                    "id": x.id,
+                    "updatedAt": x.updatedAt,
+                },
+                themes,
+            )
         )
+
+    # 24시간 캐시, 만료 후 1시간 동안은 이전 값을 주면서 한 번만 다시 조회한다
+    return await cache.get_or_set(
+        cache.cache_key("sitemaps", kind="themes"),
+        86400,
+        find_themes,
+        stale=3600,
+        tags=lambda _: [cache_tags.SITEMAPS],
     )
-    return themes
+
+
+def _base_url(request: Request) -> str:
+    """
+    sitemap index 를 요청한 호스트. 프론트가 /sitemaps/*.xml 을 프록시하면 프론트 주소가 된다.
+    (알려진 호스트가 아니면 백엔드 주소)
+    """
+    host = request.headers.get("x-forwarded-host") or request.headers.get("host", "")
+    for url in (settings.front_main_url, settings.backend_url):
+        if urlsplit(url).netloc == host:
+            return url
+    return settings.backend_url
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Accept-Encoding 의 코딩별 q 값으로 gzip 을 받을 수 있는지 판단한다.
+    gzip 이 없으면 * 의 q 값을 따르고, q=0 은 받지 않겠다는 뜻이다.
+    """
+    qualities = {}
+    for token in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in token.split(";"))
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[coding.lower()] = q
+    q = qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0)))
+    return q > 0
+
+
+@router.get("/{name}.xml")
+async def get_sitemap_xml(
+    request: Request, name: str, accept_encoding: str = Header(default="")
+):
+    """
+    sitemap XML (index.xml 은 sitemap index, 나머지는 최대 5만 URL 씩 나눈 조각)
+    """
+    if name == "index":
+        sitemap = await sitemap_store.get_index(_base_url(request))
+    else:
+        sitemap = await sitemap_store.get(name)
+    if sitemap is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="sitemap 을 찾을 수 없습니다.",
+        )
+
+    headers = {
+        "ETag": sitemap.etag,
+        "Last-Modified": format_datetime(sitemap.last_modified, usegmt=True),
+        "Vary": "Accept-Encoding",
+    }
+    if is_fresh(request.headers, headers["ETag"], headers["Last-Modified"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # 미리 압축해 둔 본문을 그대로 보낸다
+    if _accepts_gzip(accept_encoding):
+        headers["Content-Encoding"] = "gzip"
+        body = sitemap.body
+    else:
+        body = gzip.decompress(sitemap.body)
+    return Response(content=body, media_type="application/xml", headers=headers)
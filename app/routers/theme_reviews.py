@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends
 from app.prisma import prisma
 from app.models.auth import AccessUser
 from app.models.theme_review import UpdateThemeReview
-from app.utils.find_many_cursor import find_many_cursor
+from app.utils.keyset import find_many_keyset
 from app.services import auth as auth_service
 from app.services import theme_reviews as theme_reviews_service
 
@@ -21,12 +21,12 @@ async def get_reviews(
     nickname: str,
     take: Optional[int] = 20,
     cursor: Optional[str] = None,
+    direction: Optional[str] = "next",
 ):
     """
     테마 리뷰 리스트 조회
     """
     options = {
-        "take": take + 1,
         "where": {
             "user": {
                 "nickname": nickname,
@@ -36,13 +36,17 @@ async def get_reviews(
             "theme": True,
             "user": True,
         },
-        "order": {"createdAt": "desc"},
     }
-    if cursor:
-        options["cursor"] = {"id": cursor}
 
-    themereviews = await prisma.themereview.find_many(**options)
-    result = find_many_cursor(themereviews, take=take, cursor=cursor)
+    result = await find_many_keyset(
+        prisma.themereview,
+        options,
+        sort="createdAt",
+        order="desc",
+        take=take,
+        cursor=cursor,
+        direction=direction,
+    )
     return result
 
 
@@ -74,22 +78,28 @@ async def update_review(
     테마 리뷰 수정
     """
     try:
-        await prisma.themereview.update_many(
-            where={
-                "id": id,
-                "userId": current_user.id,
-            },
-            data={
-                "rating": body.rating,
-                "success": body.success,
-                "level": body.level,
-                "fear": body.fear,
-                "activity": body.activity,
-                "text": body.text,
-            },
-        )
+        async with prisma.tx() as tx:
+            review = await theme_reviews_service.find_review_for_update(
+                tx, id, current_user.id
+            )
+            if review:
+                updated = await tx.themereview.update(
+                    where={"id": id},
+                    data={
+                        "rating": body.rating,
+                        "success": body.success,
+                        "level": body.level,
+                        "fear": body.fear,
+                        "activity": body.activity,
+                        "text": body.text,
+                    },
+                )
+                await theme_reviews_service.apply_review_delta(
+                    tx, review.themeId, review, updated
+                )
 
-        await theme_reviews_service.update_theme_review(themeId)
+        if review:
+            await theme_reviews_service.sync_theme_review(review.themeId)
 
         return True
     except:
@@ -105,11 +115,15 @@ async def delete_review(
     """
     테마 리뷰 삭제
     """
-    await prisma.themereview.delete_many(
-        where={
-            "id": id,
-            "userId": current_user.id,
-        }
-    )
+    async with prisma.tx() as tx:
+        review = await theme_reviews_service.find_review_for_update(
+            tx, id, current_user.id
+        )
+        if review:
+            await tx.themereview.delete(where={"id": id})
+            await theme_reviews_service.apply_review_delta(
+                tx, review.themeId, review, None
+            )
 
-    await theme_reviews_service.update_theme_review(themeId)
+    if review:
+        await theme_reviews_service.sync_theme_review(review.themeId)
@@ -1,13 +1,23 @@
-from prisma import types
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Header, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 
 from app.prisma import prisma
+from app.config import settings
 from app.models.auth import AccessUser
 from app.models.theme import CreateThemeReview
-from app.utils.find_many_cursor import find_many_cursor
+from app.utils import cache
+from app.utils.etag import version_etag
+from app.utils.keyset import find_many_keyset
+from app.utils.projection import parse_projection
 from app.services import auth as auth_service
+from app.services import cache_tags
+from app.services import details as details_service
+from app.services import saves as saves_service
+from app.services import theme_list as theme_list_service
 from app.services import theme_reviews as theme_reviews_service
+from app.services.similar import theme_similarity
+from app.services.theme_catalog import theme_catalog
+from app.services.view_counter import theme_views
 
 
 router = APIRouter(
@@ -16,6 +26,8 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+THEME_PAGE_TAGS = cache_tags.page_tags(cache_tags.theme_tags, cache_tags.THEME_LIST)
+
 
 @router.get("")
 async def get_themes(
@@ -31,102 +43,119 @@ async def get_themes(
     lockingRatio: Optional[str] = None,
     take: Optional[int] = 20,
     cursor: Optional[str] = None,
-    sort: Optional[str] = "createdAt",
+    direction: Optional[str] = "next",
+    sort: Optional[str] = None,
     order: Optional[str] = "desc",
-    authorization: str = Header(default=""),
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    current_user: Optional[AccessUser] = Depends(auth_service.get_optional_user),
 ):
-    current_user = None
-    if authorization:
-        token = authorization.replace("Bearer ", "")
-        current_user = await auth_service.get_current_user(token)
-
-    options: types.FindManyThemeArgsFromTheme = {
-        "take": take + 1,
-        "where": {"status": "PUBLISHED"},
-        "include": {
-            "cafe": True,
-            "genre": True,
-        },
-        "order": {sort: order},
+    # 로그인 여부와 상관없이 익명 결과를 공유 캐시에서 읽고, 저장 여부만 덧붙인다
+    params = {
+        "term": term,
+        "cafeId": cafeId,
+        "areaA": areaA,
+        "areaB": areaB,
+        "genre": genre,
+        "level": level,
+        "person": person,
+        "fearScore": fearScore,
+        "activity": activity,
+        "lockingRatio": lockingRatio,
+        "take": take,
+        "cursor": cursor,
+        "direction": direction,
+        "sort": sort,
+        "order": order,
+        "fields": fields,
+        "include": include,
     }
-    if term:
-        options["where"]["displayName"] = {"contains": term}
-    if cafeId:
-        options["where"]["cafe"] = {"id": cafeId}
-    if areaA:
-        options["where"]["cafe"] = {"areaA": areaA}
-    if areaB:
-        options["where"]["cafe"] = {"areaB": areaB}
-    if genre:
-        options["where"]["genre"] = {"some": {"id": genre}}
-    if level:
-        options["where"]["level"] = level
-    if person:
-        options["where"]["minPerson"] = {"lte": person}
-        options["where"]["maxPerson"] = {"gte": person}
-    if fearScore:
-        if fearScore == "hight":
-            options["where"]["fear"] = {"gte": 4}
-        elif fearScore == "low":
-            options["where"]["fear"] = {"gte": 1, "lte": 2}
-        else:
-            options["where"]["fear"] = {"gt": 2, "lt": 4}
-    if activity:
-        if activity == "hight":
-            options["where"]["activity"] = {"gte": 4}
-        elif activity == "low":
-            options["where"]["activity"] = {"gte": 1, "lte": 2}
-        else:
-            options["where"]["activity"] = {"gt": 2, "lt": 4}
-    if lockingRatio:
-        if lockingRatio == "hight":
-            options["where"]["lockingRatio"] = {"gte": 70}
-        elif lockingRatio == "low":
-            options["where"]["lockingRatio"] = {"gte": 1, "lte": 40}
-        else:
-            options["where"]["lockingRatio"] = {"gt": 40, "lt": 70}
-    if cursor:
-        options["cursor"] = {"id": cursor}
-    if current_user:
-        options["include"]["saves"] = {
-            "where": {"userId": current_user.id},
-        }
+    key = cache.cache_key("themes", **params)
+    if not current_user:
+        # 익명 응답은 캐시된 bytes 와 ETag 를 그대로 내려준다
+        etag, data = await cache.get_or_set_entry(
+            key,
+            settings.list_cache_expire,
+            lambda: theme_list_service.find_themes(**params),
+            tags=THEME_PAGE_TAGS,
+        )
+        return Response(
+            content=data, media_type="application/json", headers={"ETag": etag}
+        )
 
-    themes = await prisma.theme.find_many(**options)
-    result = find_many_cursor(themes, take=take, cursor=cursor)
+    result = await cache.get_or_set(
+        key,
+        settings.list_cache_expire,
+        lambda: theme_list_service.find_themes(**params),
+        tags=THEME_PAGE_TAGS,
+    )
+    saves = await saves_service.get_theme_saves(current_user.id)
+    saves_service.overlay_many(result["items"], saves)
     return result
 
 
 @router.get("/{id}")
 async def get_theme_detail(
     id: str,
-    authorization: str = Header(default=""),
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    current_user: Optional[AccessUser] = Depends(auth_service.get_optional_user),
 ):
-    current_user = None
-    if authorization:
-        token = authorization.replace("Bearer ", "")
-        current_user = await auth_service.get_current_user(token)
-
-    options = {
-        "where": {"id": id},
-        "include": {
-            "cafe": True,
-            "genre": True,
-            "reviews": True,
-        },
-    }
-    if current_user:
-        options["include"]["saves"] = {
-            "where": {"userId": current_user.id},
+    async def find_theme():
+        options = {
+            "where": {"id": id},
+            "include": {
+                "cafe": True,
+                "genre": True,
+                "reviews": True,
+            },
         }
+        projection = parse_projection(
+            "Theme", fields, include, default_include=("cafe", "genre", "reviews")
+        )
+        if projection:
+            options["include"] = projection.include()
 
-    theme = await prisma.theme.find_unique(**options)
+        actions = projection.actions(prisma) if projection else prisma.theme
+        return await actions.find_unique(**options)
 
-    await prisma.theme.update(
-        where={"id": id},
-        data={"view": {"increment": 1}},
+    # 직렬화된 bytes 를 그대로 내려주고, 로그인 사용자는 저장 여부만 덧붙인다
+    etag, data = await cache.get_or_set_entry(
+        details_service.theme_key(id, fields=fields, include=include),
+        settings.detail_cache_expire,
+        find_theme,
+        tags=lambda theme: {cache_tags.theme_tag(id)} | cache_tags.theme_tags(theme),
     )
-    return theme
+    if current_user:
+        saves = await saves_service.get_theme_saves(current_user.id)
+        save = saves.get(id)
+        data = cache.merge(data, saves=[save] if save else [])
+        etag = version_etag(etag, save["id"] if save else "")
+
+    if data != b"null":
+        theme_views.add(id)
+    return Response(
+        content=data, media_type="application/json", headers={"ETag": etag}
+    )
+
+
+@router.get("/{id}/similar")
+async def get_similar_themes(id: str, take: int = 10):
+    """
+    장르, 지역, 난이도/공포도/활동성 등이 비슷한 테마 (인메모리 유사도 인덱스)
+    """
+    if not theme_similarity.ready:
+        return []
+
+    similar = theme_similarity.similar(id, min(take, 50))
+    if similar is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="테마를 찾을 수 없습니다.",
+        )
+    themes = (theme_catalog.get(similar_id) for similar_id, _ in similar)
+    # ETag 는 ETagMiddleware 가 응답 본문(유사 테마 목록)으로 계산한다
+    return [theme for theme in themes if theme]
 
 
 @router.post("/{id}/save", response_model=bool)
@@ -144,6 +173,7 @@ async def save_theme(
                 "user": {"connect": {"id": current_user.id}},
             }
         )
+        await saves_service.invalidate_theme_saves(current_user.id)
         return True
     return False
 
@@ -158,6 +188,7 @@ async def unsave_theme(
     )
     if theme_save:
         await prisma.themesave.delete(where={"id": theme_save.id})
+        await saves_service.invalidate_theme_saves(current_user.id)
         return True
     return False
 
@@ -167,20 +198,24 @@ async def get_theme_reviews(
     id: str,
     take: Optional[int] = 10,
     cursor: Optional[str] = None,
+    direction: Optional[str] = "next",
 ):
     options = {
-        "take": take + 1,
         "where": {"themeId": id},
         "include": {
             "user": True,
         },
-        "order": {"createdAt": "desc"},
     }
-    if cursor:
-        options["cursor"] = {"id": cursor}
 
-    reviews = await prisma.themereview.find_many(**options)
-    result = find_many_cursor(reviews, take=take, cursor=cursor)
+    result = await find_many_keyset(
+        prisma.themereview,
+        options,
+        sort="createdAt",
+        order="desc",
+        take=take,
+        cursor=cursor,
+        direction=direction,
+    )
     return result
 
 
@@ -203,19 +238,21 @@ async def write_review_on_theme(
         )
 
     try:
-        await prisma.themereview.create(
-            data={
-                "theme": {"connect": {"id": id}},
-                "rating": body.rating,
-                "success": body.success,
-                "level": body.level,
-                "fear": body.fear,
-                "activity": body.activity,
-                "text": body.text,
-                "user": {"connect": {"id": current_user.id}},
-            }
-        )
-        await theme_reviews_service.update_theme_review(id)
+        async with prisma.tx() as tx:
+            review = await tx.themereview.create(
+                data={
+                    "theme": {"connect": {"id": id}},
+                    "rating": body.rating,
+                    "success": body.success,
+                    "level": body.level,
+                    "fear": body.fear,
+                    "activity": body.activity,
+                    "text": body.text,
+                    "user": {"connect": {"id": current_user.id}},
+                }
+            )
+            await theme_reviews_service.apply_review_delta(tx, id, None, review)
+        await theme_reviews_service.sync_theme_review(id)
         return True
     except Exception as e:
         raise HTTPException(
@@ -229,15 +266,19 @@ async def get_theme_blog_reviews(
     id: str,
     take: Optional[int] = 10,
     cursor: Optional[str] = None,
+    direction: Optional[str] = "next",
 ):
     options = {
-        "take": take + 1,
         "where": {"themeId": id},
-        "order": {"createdAt": "desc"},
     }
-    if cursor:
-        options["cursor"] = {"id": cursor}
 
-    reviews = await prisma.blogreview.find_many(**options)
-    result = find_many_cursor(reviews, take=take, cursor=cursor)
+    result = await find_many_keyset(
+        prisma.blogreview,
+        options,
+        sort="createdAt",
+        order="desc",
+        take=take,
+        cursor=cursor,
+        direction=direction,
+    )
     return result
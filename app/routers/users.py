@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends
 from app.prisma import prisma
 from app.models.user import User
 from app.services import auth as auth_service
-from app.utils.find_many_cursor import find_many_cursor
+from app.utils.keyset import find_many_keyset
 
 
 router = APIRouter(
@@ -33,9 +33,9 @@ async def get_saved_cafes(
     current_user: User = Depends(auth_service.get_current_user),
     take: Optional[int] = 20,
     cursor: Optional[str] = None,
+    direction: Optional[str] = "next",
 ):
     options = {
-        "take": take + 1,
         "where": {
             "saves": {"some": {"userId": current_user.id}},
         },
@@ -43,11 +43,16 @@ async def get_saved_cafes(
             "saves": True,
         },
     }
-    if cursor:
-        options["cursor"] = {"id": cursor}
 
-    cafes = await prisma.cafe.find_many(**options)
-    result = find_many_cursor(cafes, take=take, cursor=cursor)
+    result = await find_many_keyset(
+        prisma.cafe,
+        options,
+        sort="id",
+        order="asc",
+        take=take,
+        cursor=cursor,
+        direction=direction,
+    )
     return result
 
 
@@ -56,9 +61,9 @@ async def get_saved_themes(
     current_user: User = Depends(auth_service.get_current_user),
     take: Optional[int] = 20,
     cursor: Optional[str] = None,
+    direction: Optional[str] = "next",
 ):
     options = {
-        "take": take + 1,
         "where": {
             "saves": {"some": {"userId": current_user.id}},
         },
@@ -68,9 +73,14 @@ async def get_saved_themes(
             "genre": True,
         },
     }
-    if cursor:
-        options["cursor"] = {"id": cursor}
 
-    themes = await prisma.theme.find_many(**options)
-    result = find_many_cursor(themes, take=take, cursor=cursor)
+    result = await find_many_keyset(
+        prisma.theme,
+        options,
+        sort="id",
+        order="asc",
+        take=take,
+        cursor=cursor,
+        direction=direction,
+    )
     return result
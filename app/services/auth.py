@@ -1,5 +1,6 @@
+from typing import Optional
 from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, Response, status
+from fastapi import Depends, Header, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordBearer
 
 from app.prisma import prisma
@@ -12,6 +13,7 @@ from app.models.auth import (
     SignupBySocialDto,
 )
 from app.utils import auth as auth_utils
+from app.utils.token_cache import TokenCache
 
 ACCESS_TOKEN_EXPIRE_IN = 3600  # 1 hour
 REFRESH_TOKEN_EXPIRE_IN = 3600 * 24 * 30  # 1 month
@@ -19,17 +21,24 @@ REGISTER_TOKEN_EXPIRE_IN = 3600 * 24  # 1 day
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
+# 같은 토큰으로 들어오는 요청은 서명 검증 없이 캐시된 사용자를 쓴다
+token_cache = TokenCache(settings.token_cache_size)
+
 
 async def authenticate_user(email: str, password: str):
     user = await prisma.user.find_unique(where={"email": email})
     if not user:
         return False
-    if not auth_utils.verify_password(password, user.password):
+    if not await auth_utils.verify_password_async(password, user.password):
         return False
     return user
 
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="자격증명을 확인할 수 없습니다.",
@@ -44,11 +53,23 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         if userId is None:
             raise credentials_exception
         user = AccessUser(id=userId, provider=provider)
+        token_cache.put(token, user, payload.get("exp"))
         return user
     except JWTError:
         raise credentials_exception
 
 
+async def get_optional_user(
+    authorization: str = Header(default=""),
+) -> Optional[AccessUser]:
+    """
+    Authorization 헤더가 있으면 검증한 사용자를, 없으면 None 을 반환한다.
+    """
+    if not authorization:
+        return None
+    return await get_current_user(authorization.replace("Bearer ", ""))
+
+
 async def refresh(res: Response, user: AccessUser):
     if not user:
         res.delete_cookie(key="refreshToken", domain=settings.domain, path="/")
@@ -111,7 +132,7 @@ async def change_password(user_id: str, body: ChangePasswordDto):
                 detail="현재 비밀번호를 입력해주세요.",
             )
 
-        valid_password = auth_utils.verify_password(
+        valid_password = await auth_utils.verify_password_async(
             body.oldPassword,
             user.password,
         )
@@ -121,7 +142,7 @@ async def change_password(user_id: str, body: ChangePasswordDto):
                 detail="잘못된 비밀번호입니다.",
             )
 
-    hashed_password = auth_utils.get_password_hash(body.newPassword)
+    hashed_password = await auth_utils.get_password_hash_async(body.newPassword)
     user = await prisma.user.update(
         where={"id": user_id},
         data={"password": hashed_password},
@@ -167,7 +188,7 @@ async def send_password_by_email(email: str):
         )
 
     password = auth_utils.generate_password()
-    hashed_password = auth_utils.get_password_hash(password)
+    hashed_password = await auth_utils.get_password_hash_async(password)
 
     await prisma.user.update(
         where={"email": email},
@@ -274,7 +295,7 @@ async def signup_by_email(res: Response, body: SignupByEmaileDto):
             detail="닉네임이 중복되었습니다.",
         )
 
-    hashed_password = auth_utils.get_password_hash(body.password)
+    hashed_password = await auth_utils.get_password_hash_async(body.password)
     user = await prisma.user.create(
         data={
             "email": body.email,
@@ -410,7 +431,7 @@ async def login_by_email(res: Response, email: str, password: str):
             detail="사용자를 찾을 수 없습니다.",
         )
 
-    valid_password = auth_utils.verify_password(
+    valid_password = await auth_utils.verify_password_async(
         password,
         user.password,
     )
@@ -496,6 +517,7 @@ async def login_by_social(res: Response, provider: str, email: str):
 
 async def logout(res: Response, userId: str):
     res.delete_cookie(key="refreshToken", domain=settings.domain, path="/")
+    token_cache.revoke_user(userId)
 
     await prisma.user.update_many(
         where={
@@ -0,0 +1,76 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+# 엔티티 id 가 없는 캐시 태그
+FAQ = "faq"
+SITEMAPS = "sitemaps"
+# 목록 페이지 전체 (리뷰/공개 상태 변경으로 페이지에 들어오거나 순서가 바뀌는 경우)
+THEME_LIST = "themes:list"
+CAFE_LIST = "cafes:list"
+
+
+def theme_tag(id: str) -> str:
+    return f"theme:{id}"
+
+
+def cafe_tag(id: str) -> str:
+    return f"cafe:{id}"
+
+
+def genre_tag(id: str) -> str:
+    return f"genre:{id}"
+
+
+def theme_tags(theme: Optional[Dict[str, Any]]) -> Set[str]:
+    """
+    직렬화된 테마에 들어있는 테마/카페/장르 태그
+    """
+    if not theme:
+        return set()
+    tags = {theme_tag(theme["id"])}
+    cafe = theme.get("cafe")
+    if cafe:
+        tags.add(cafe_tag(cafe["id"]))
+    elif theme.get("cafeId"):
+        tags.add(cafe_tag(theme["cafeId"]))
+    for genre in theme.get("genre") or ():
+        tags.add(genre_tag(genre["id"]))
+    return tags
+
+
+def cafe_tags(cafe: Optional[Dict[str, Any]]) -> Set[str]:
+    """
+    직렬화된 카페와 소속 테마들의 태그
+    """
+    if not cafe:
+        return set()
+    tags = {cafe_tag(cafe["id"])}
+    for theme in cafe.get("themes") or ():
+        tags.add(theme_tag(theme["id"]))
+    return tags
+
+
+def genre_tags(genres: List[Dict[str, Any]]) -> Set[str]:
+    """
+    직렬화된 장르 목록과 장르별 테마들의 태그
+    """
+    tags = set()
+    for genre in genres:
+        tags.add(genre_tag(genre["id"]))
+        for theme in genre.get("themes") or ():
+            tags.add(theme_tag(theme["id"]))
+    return tags
+
+
+def page_tags(
+    item_tags: Callable[[Dict[str, Any]], Iterable[str]], list_tag: str
+) -> Callable[[Dict[str, Any]], Set[str]]:
+    """
+    keyset 페이지({"items": [...]})의 항목별 태그와 목록 전체 태그(list_tag)를 모은다.
+    """
+
+    def tags(page: Dict[str, Any]) -> Set[str]:
+        tags = {tag for item in page.get("items") or () for tag in item_tags(item)}
+        tags.add(list_tag)
+        return tags
+
+    return tags
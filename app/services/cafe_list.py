@@ -0,0 +1,81 @@
+from typing import Optional
+
+from prisma import types
+
+from app.prisma import prisma
+from app.utils.keyset import find_many_keyset, keyset_page
+from app.utils.projection import parse_projection
+from app.services import search as search_service
+
+
+async def find_cafes(
+    term: Optional[str] = None,
+    areaA: Optional[str] = None,
+    areaB: Optional[str] = None,
+    take: Optional[int] = 20,
+    cursor: Optional[str] = None,
+    direction: Optional[str] = "next",
+    sort: Optional[str] = None,
+    order: Optional[str] = "desc",
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+):
+    """
+    사용자와 무관한(익명) 카페 목록을 조회한다.
+    """
+    # 검색어가 있으면 기본 정렬은 검색 정확도순
+    sort = sort or ("relevance" if term else "createdAt")
+
+    options: types.FindManyCafeArgsFromCafe = {
+        "where": {"status": "PUBLISHED"},
+        "include": {"themes": True},
+    }
+
+    # fields/include 가 있으면 필요한 컬럼만 조회한다
+    projection = parse_projection(
+        "Cafe",
+        fields,
+        include,
+        default_include=("themes",),
+        required=("id", "createdAt", sort),
+    )
+    if projection:
+        options["include"] = projection.include()
+
+    ranking = None
+    if term and search_service.cafe_index.ready:
+        ranking = search_service.cafe_index.search(
+            term, where={"areaA": areaA, "areaB": areaB}
+        )
+        options["where"]["id"] = {"in": [id for id, _ in ranking]}
+    elif term:
+        options["where"]["name"] = {"contains": term}
+    if areaA:
+        options["where"]["areaA"] = areaA
+    if areaB:
+        options["where"]["areaB"] = areaB
+    actions = projection.actions(prisma) if projection else prisma.cafe
+
+    if ranking is not None and sort == "relevance":
+        page = search_service.ranked_page(
+            ranking, take=take + 1, cursor=cursor, direction=direction
+        )
+        options["where"]["id"] = {"in": [id for id, _ in page]}
+        cafes = await actions.find_many(**options)
+        cafes = search_service.order_by_ranking(cafes, page)
+        scores = dict(page)
+        result = keyset_page(
+            cafes, sort, take, cursor, direction, key=lambda cafe: scores[cafe.id]
+        )
+        return result
+
+    result = await find_many_keyset(
+        actions,
+        options,
+        sort="createdAt" if sort == "relevance" else sort,
+        order=order,
+        take=take,
+        cursor=cursor,
+        direction=direction,
+    )
+    return result
@@ -1,14 +1,85 @@
+from typing import Optional
+
+from prisma import Prisma, models
+
 from app.prisma import prisma
+from app.services import details as details_service
+from app.services.theme_catalog import theme_catalog
+
+# 리뷰 한 건의 변경분을 카페의 누적 합계/개수에 더하고 평균을 다시 계산한다.
+# MySQL 은 SET 절을 왼쪽부터 차례로 평가하므로 평균은 갱신된 합계/개수로 계산된다.
+APPLY_DELTA_SQL = """
+UPDATE `cafes` SET
+    `reviewsCount` = `reviewsCount` + ?,
+    `reviewsRatingSum` = `reviewsRatingSum` + ?,
+    `reviewsRating` = IF(`reviewsCount` > 0, `reviewsRatingSum` / `reviewsCount`, 0),
+    `reviewsStale` = `reviewsStale` OR `reviewsCount` < 0
+WHERE `id` = ?
+"""
+
+
+# 같은 리뷰의 동시 수정/삭제가 같은 이전 값으로 변경분을 계산하지 않도록 행을 잠그고 읽는다
+FIND_REVIEW_FOR_UPDATE_SQL = """
+SELECT * FROM `cafe_reviews` WHERE `id` = ? AND `userId` = ? FOR UPDATE
+"""
+
+
+async def find_review_for_update(
+    client: Prisma, id: str, userId: str
+) -> Optional[models.CafeReview]:
+    """
+    리뷰 쓰기 트랜잭션(client)에서 사용자의 리뷰를 잠그고 읽는다.
+    먼저 잠근 트랜잭션이 커밋할 때까지 기다린 뒤 커밋된 값을 읽으므로,
+    변경분은 항상 최신 값에서 계산된다.
+    """
+    return await client.query_first(
+        FIND_REVIEW_FOR_UPDATE_SQL, id, userId, model=models.CafeReview
+    )
+
+
+async def apply_review_delta(
+    client: Prisma,
+    cafeId: str,
+    old: Optional[models.CafeReview],
+    new: Optional[models.CafeReview],
+):
+    """
+    리뷰 쓰기와 같은 트랜잭션(client)에서 카페 평점 데이터를 변경분만큼 갱신한다.
+    (작성은 old=None, 삭제는 new=None)
+    """
+    count = 0
+    rating_sum = 0.0
+    for review, sign in ((old, -1), (new, 1)):
+        if review is not None:
+            count += sign
+            rating_sum += sign * review.rating
+    await client.execute_raw(APPLY_DELTA_SQL, count, rating_sum, cafeId)
+
+
+async def sync_cafe_review(cafeId: str):
+    """
+    리뷰 쓰기가 커밋된 뒤 카탈로그와 상세 캐시에 반영한다.
+    누적 값이 어긋난 것(stale)이 발견되면 전체 재계산으로 복구한다.
+    """
+    cafe = await prisma.cafe.find_unique(where={"id": cafeId})
+    if cafe and cafe.reviewsStale:
+        await update_cafe_review(cafeId)
+        return
+
+    await theme_catalog.refresh_cafe(cafeId)
+    await details_service.invalidate_cafe(cafeId)
 
 
 async def update_cafe_review(cafeId: str):
     """
     카페 리뷰들을 읽어와 평점을 계산하여 카페에 평균 데이터를 업데이트 한다.
+    누적 값이 어긋났을 때 복구하는 용도로 사용한다.
     """
     reviews = await prisma.cafereview.find_many(where={"cafeId": cafeId})
     reviews_count = len(reviews)
+    reviews_rating_score = sum(list(map(lambda x: x.rating, reviews)))
     if reviews_count:
-        reviews_rating = sum(list(map(lambda x: x.rating, reviews))) / reviews_count
+        reviews_rating = reviews_rating_score / reviews_count
     else:
         reviews_rating = 0
 
@@ -17,5 +88,9 @@ async def update_cafe_review(cafeId: str):
         data={
             "reviewsRating": reviews_rating,
             "reviewsCount": reviews_count,
+            "reviewsRatingSum": reviews_rating_score,
+            "reviewsStale": False,
         },
     )
+    await theme_catalog.refresh_cafe(cafeId)
+    await details_service.invalidate_cafe(cafeId)
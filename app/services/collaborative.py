@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from fastapi.encoders import jsonable_encoder
+
+from app.prisma import prisma
+from app.config import settings
+from app.services import saves as saves_service
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# (userId, itemId, 가중치)
+Interaction = Tuple[str, str, float]
+
+
+@dataclass
+class _Model:
+    ids: List[str]
+    index: Dict[str, int]
+    similarity: sp.csr_matrix
+    available: np.ndarray
+
+
+def _top_neighbours(similarity: sp.csr_matrix, k: int) -> sp.csr_matrix:
+    """
+    행마다 유사도가 높은 k 개만 남긴다.
+    """
+    indptr = [0]
+    indices = []
+    data = []
+    for row in range(similarity.shape[0]):
+        start, end = similarity.indptr[row], similarity.indptr[row + 1]
+        values = similarity.data[start:end]
+        columns = similarity.indices[start:end]
+        if len(values) > k:
+            keep = np.argpartition(-values, k - 1)[:k]
+            values, columns = values[keep], columns[keep]
+        data.append(values)
+        indices.append(columns)
+        indptr.append(indptr[-1] + len(values))
+    return sp.csr_matrix(
+        (
+            np.concatenate(data) if data else np.zeros(0),
+            np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32),
+            np.array(indptr),
+        ),
+        shape=similarity.shape,
+    )
+
+
+def build_similarity(
+    interactions: List[Interaction], neighbours: int
+) -> Tuple[List[str], sp.csr_matrix]:
+    """
+    사용자 x 아이템 행렬을 만들고 아이템 간 코사인 유사도(이웃 neighbours 개)를 계산한다.
+    """
+    users: Dict[str, int] = {}
+    items: Dict[str, int] = {}
+    rows, columns, weights = [], [], []
+    for user_id, item_id, weight in interactions:
+        rows.append(users.setdefault(user_id, len(users)))
+        columns.append(items.setdefault(item_id, len(items)))
+        weights.append(float(weight))
+
+    # 같은 (사용자, 아이템) 의 저장/리뷰 가중치는 합산된다
+    matrix = sp.csr_matrix(
+        (weights, (rows, columns)), shape=(len(users), len(items)), dtype=np.float32
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0))).ravel()
+    norms[norms == 0] = 1
+    matrix = matrix @ sp.diags(1 / norms)
+
+    similarity = (matrix.T @ matrix).tocsr()
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+    return list(items), _top_neighbours(similarity, neighbours)
+
+
+class ItemSimilarity:
+    """
+    저장/리뷰 기록으로 만든 아이템-아이템 협업 필터링 모델.
+
+    유사도 행렬은 백그라운드에서 주기적으로 다시 계산하고, 요청 시에는
+    사용자가 저장/리뷰한 아이템 id 만 읽어 희소 벡터 곱으로 점수를 매긴다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        load_interactions: Callable[[], Awaitable[List[Interaction]]],
+        load_items: Callable[[List[str]], Awaitable[Dict[str, Dict[str, Any]]]],
+        load_user: Callable[[str], Awaitable[Dict[str, float]]],
+    ):
+        self.name = name
+        self._load_interactions = load_interactions
+        self._load_items = load_items
+        self._load_user = load_user
+        self._model: Optional[_Model] = None
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._model is not None
+
+    async def rebuild(self):
+        started = time.perf_counter()
+        interactions = await self._load_interactions()
+        loop = asyncio.get_running_loop()
+        ids, similarity = await loop.run_in_executor(
+            None, build_similarity, interactions, settings.recommend_cf_neighbours
+        )
+        items = await self._load_items(ids)
+        available = np.array([id in items for id in ids], dtype=bool)
+
+        self._model = _Model(
+            ids=ids,
+            index={id: i for i, id in enumerate(ids)},
+            similarity=similarity,
+            available=available,
+        )
+        self._items = items
+        metrics.observe(f"recommend.{self.name}.cf_build", time.perf_counter() - started)
+
+    async def recommend(self, user_id: str, k: int) -> List[Dict[str, Any]]:
+        """
+        사용자가 저장/리뷰한 아이템과 비슷한 아이템 k 개. 기록이 없으면 빈 목록.
+        """
+        model = self._model
+        if model is None:
+            return []
+
+        seen = await self._load_user(user_id)
+        seen = {model.index[id]: w for id, w in seen.items() if id in model.index}
+        if not seen:
+            return []
+
+        vector = sp.csr_matrix(
+            (list(seen.values()), ([0] * len(seen), list(seen))),
+            shape=(1, len(model.ids)),
+        )
+        scores = (vector @ model.similarity).toarray().ravel()
+        scores[list(seen)] = 0
+        scores[~model.available] = 0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [self._items[model.ids[i]] for i in candidates]
+
+    async def _run(self):
+        while True:
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.warning("recommend %s cf build failed: %s", self.name, e)
+            await asyncio.sleep(settings.recommend_cf_refresh_interval)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+async def _theme_interactions() -> List[Interaction]:
+    rows = await prisma.query_raw(
+        """
+        SELECT userId, themeId AS itemId, 1.0 AS weight FROM theme_saves
+        UNION ALL
+        SELECT userId, themeId AS itemId, rating / 5 AS weight FROM theme_reviews
+        """
+    )
+    return [(row["userId"], row["itemId"], row["weight"]) for row in rows]
+
+
+async def _theme_items(ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    themes = await prisma.theme.find_many(
+        where={"id": {"in": ids}, "status": "PUBLISHED"},
+        include={"cafe": True, "genre": True},
+    )
+    return {theme.id: jsonable_encoder(theme) for theme in themes}
+
+
+async def _theme_user(user_id: str) -> Dict[str, float]:
+    seen = {id: 1.0 for id in await saves_service.get_theme_saves(user_id)}
+    reviews = await prisma.query_raw(
+        "SELECT themeId, rating FROM theme_reviews WHERE userId = ?", user_id
+    )
+    for review in reviews:
+        seen[review["themeId"]] = seen.get(review["themeId"], 0) + review["rating"] / 5
+    return seen
+
+
+async def _cafe_interactions() -> List[Interaction]:
+    rows = await prisma.query_raw(
+        """
+        SELECT userId, cafeId AS itemId, 1.0 AS weight FROM cafe_saves
+        UNION ALL
+        SELECT userId, cafeId AS itemId, rating / 5 AS weight FROM cafe_reviews
+        """
+    )
+    return [(row["userId"], row["itemId"], row["weight"]) for row in rows]
+
+
+async def _cafe_items(ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    cafes = await prisma.cafe.find_many(
+        where={"id": {"in": ids}, "status": "PUBLISHED"},
+    )
+    return {cafe.id: jsonable_encoder(cafe) for cafe in cafes}
+
+
+async def _cafe_user(user_id: str) -> Dict[str, float]:
+    seen = {id: 1.0 for id in await saves_service.get_cafe_saves(user_id)}
+    reviews = await prisma.query_raw(
+        "SELECT cafeId, rating FROM cafe_reviews WHERE userId = ?", user_id
+    )
+    for review in reviews:
+        seen[review["cafeId"]] = seen.get(review["cafeId"], 0) + review["rating"] / 5
+    return seen
+
+
+theme_cf = ItemSimilarity("themes", _theme_interactions, _theme_items, _theme_user)
+cafe_cf = ItemSimilarity("cafes", _cafe_interactions, _cafe_items, _cafe_user)
@@ -0,0 +1,27 @@
+from typing import Any
+
+from app.services import cache_tags
+from app.utils import cache
+
+
+def theme_key(id: str, **params: Any) -> str:
+    return cache.entity_key("theme", id, **params)
+
+
+def cafe_key(id: str, **params: Any) -> str:
+    return cache.entity_key("cafe", id, **params)
+
+
+async def invalidate_theme(id: str):
+    """
+    테마가 들어있는 캐시(테마 상세, 카페 상세, 목록, 장르)와, 평점/리뷰 수가 바뀌어
+    테마가 새로 들어오거나 순서가 바뀔 수 있는 테마 목록 페이지를 지운다.
+    """
+    await cache.invalidate(cache_tags.theme_tag(id), cache_tags.THEME_LIST)
+
+
+async def invalidate_cafe(id: str):
+    """
+    카페가 들어있는 캐시(카페 상세, 소속 테마 상세, 목록)와 카페 목록 페이지를 지운다.
+    """
+    await cache.invalidate(cache_tags.cafe_tag(id), cache_tags.CAFE_LIST)
@@ -0,0 +1,140 @@
+import asyncio
+import io
+import multiprocessing
+import shutil
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Any, BinaryIO, Dict, Optional
+
+from fastapi import HTTPException, status
+from PIL import Image, UnidentifiedImageError
+
+from app.config import settings
+from app.utils.images import FORMATS, Variant, transcode
+from app.utils.metrics import metrics
+from app.utils.s3 import S3Bucket
+
+# 키에 uuid 가 들어가 내용이 바뀌지 않으므로 오래 캐시한다
+VARIANT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# 원본을 이 Content-Type 으로만 올린다 (그 외에는 application/octet-stream)
+ORIGINAL_CONTENT_TYPES = {
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+    "image/bmp",
+    "image/tiff",
+}
+# 업로드 spool 을 변환용 임시 파일로 옮길 때 한 번에 읽는 크기
+COPY_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+image_bucket = S3Bucket(
+    settings.s3_bucket,
+    endpoint_url=settings.s3_endpoint_url,
+    workers=settings.s3_upload_workers,
+    multipart_threshold=settings.s3_multipart_threshold,
+    multipart_chunksize=settings.s3_multipart_chunksize,
+)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # 스레드가 있는 프로세스를 fork 하지 않도록 spawn 으로 띄운다
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.image_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+async def _upload(folder: str, variant: Variant) -> str:
+    extension, content_type = FORMATS[variant.format]
+    key = f"{folder}/{variant.width}.{extension}"
+    await image_bucket.upload(
+        io.BytesIO(variant.data),
+        key,
+        ContentType=content_type,
+        CacheControl=VARIANT_CACHE_CONTROL,
+    )
+    return f"/{key}"
+
+
+def _spool_to_path(fileobj: BinaryIO, tmp: IO[bytes]):
+    fileobj.seek(0)
+    shutil.copyfileobj(fileobj, tmp, COPY_CHUNK_SIZE)
+    tmp.flush()
+
+
+async def store_user_image(
+    fileobj: BinaryIO, size: int, content_type: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    업로드된 이미지(fileobj, 업로드 spool)를 너비별 WebP/JPEG 로 변환해 원본과 함께 올리고
+    {"original": URL, 포맷: {너비: URL}} 을 반환한다.
+
+    변환 프로세스에는 본문 대신 임시 파일 경로를 넘기고, 원본은 spool 에서 바로 올린다.
+    (업로드 전체를 메모리에 올리지 않는다)
+    """
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    with tempfile.NamedTemporaryFile(prefix="upload-") as tmp:
+        await loop.run_in_executor(None, _spool_to_path, fileobj, tmp)
+        try:
+            variants = await loop.run_in_executor(
+                _pool(),
+                transcode,
+                tmp.name,
+                settings.image_widths,
+                settings.image_jpeg_quality,
+                settings.image_webp_quality,
+            )
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            metrics.incr("images.invalid")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="이미지를 읽을 수 없습니다.",
+            )
+    metrics.observe("images.transcode", time.perf_counter() - started)
+    metrics.incr("images.input_bytes", size)
+    metrics.incr("images.output_bytes", sum(len(v.data) for v in variants))
+
+    folder = f"users/{uuid.uuid1()}"
+    original = f"{folder}/original"
+    # 이미지로 읽을 수 있는 것을 확인한 뒤에 원본을 올린다
+    urls = await asyncio.gather(
+        image_bucket.upload(
+            fileobj,
+            original,
+            ContentType=(
+                content_type
+                if content_type in ORIGINAL_CONTENT_TYPES
+                else "application/octet-stream"
+            ),
+            CacheControl=VARIANT_CACHE_CONTROL,
+        ),
+        *(_upload(folder, v) for v in variants),
+    )
+
+    result: Dict[str, Any] = {"original": f"/{original}"}
+    for variant, url in zip(variants, urls[1:]):
+        extension, _ = FORMATS[variant.format]
+        result.setdefault(extension, {})[str(variant.width)] = url
+    return result
+
+
+async def start():
+    await image_bucket.start()
+    _pool()
+
+
+async def stop():
+    global _executor
+    await image_bucket.stop()
+    if _executor is not None:
+        executor, _executor = _executor, None
+        await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
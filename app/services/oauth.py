@@ -0,0 +1,202 @@
+import logging
+from typing import Optional
+
+import httpx
+from fastapi import HTTPException, status
+from jose import JWTError, jwt
+
+from app.config import settings
+from app.utils.http_client import HttpClient
+from app.utils.jwks import JwksCache
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ISSUERS = ("https://accounts.google.com", "accounts.google.com")
+
+
+def _client(name: str) -> HttpClient:
+    return HttpClient(
+        name,
+        connect_timeout=settings.oauth_connect_timeout,
+        read_timeout=settings.oauth_read_timeout,
+        retries=settings.oauth_retries,
+        max_connections=settings.oauth_max_connections,
+    )
+
+
+google = _client("google")
+naver = _client("naver")
+kakao = _client("kakao")
+
+# provider 별 엔드포인트 (테스트에서는 로컬 stub 서버 주소로 바꿀 수 있다)
+ENDPOINTS = {
+    "google_token": "https://oauth2.googleapis.com/token",
+    "google_userinfo": "https://www.googleapis.com/oauth2/v3/userinfo",
+    "google_certs": "https://www.googleapis.com/oauth2/v3/certs",
+    "naver_token": "https://nid.naver.com/oauth2.0/token",
+    "naver_profile": "https://openapi.naver.com/v1/nid/me",
+    "kakao_token": "https://kauth.kakao.com/oauth/token",
+    "kakao_profile": "https://kapi.kakao.com/v2/user/me",
+}
+
+google_jwks = JwksCache("google", google, ENDPOINTS["google_certs"])
+
+
+def _unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_502_BAD_GATEWAY,
+        detail="소셜 로그인 서버에 연결할 수 없습니다.",
+    )
+
+
+def _unverified_email() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="이메일 인증이 완료되지 않은 계정입니다.",
+    )
+
+
+async def _verify_google_id_token(id_token: str) -> Optional[str]:
+    """
+    id_token 을 캐시된 구글 공개키로 직접 검증하고 확인된 이메일을 반환한다.
+    검증할 수 없으면(키를 받지 못함 등) None, 이메일이 인증되지 않은 계정이면 403.
+    """
+    try:
+        kid = jwt.get_unverified_header(id_token).get("kid")
+        key = await google_jwks.get_key(kid)
+        if key is None:
+            return None
+        claims = jwt.decode(
+            id_token,
+            key,
+            algorithms=["RS256"],
+            audience=settings.google_client_id,
+            issuer=GOOGLE_ISSUERS,
+            options={"verify_at_hash": False},
+        )
+    except (JWTError, httpx.HTTPError, KeyError, ValueError) as e:
+        logger.warning("google id_token verification failed: %s", e)
+        return None
+    if not claims.get("email_verified"):
+        raise _unverified_email()
+    return claims.get("email")
+
+
+async def get_google_email(code: str) -> Optional[str]:
+    """
+    인가 코드로 Access Token 을 받아 구글 계정 이메일을 조회한다. 인증에 실패하면 None.
+
+    토큰 응답의 id_token 을 직접 검증해 이메일을 읽고, id_token 이 없거나 검증할 수 없을
+    때만 userinfo 를 호출한다. 이메일이 인증되지 않은 계정이면 403.
+    """
+    try:
+        # Access Token을 받아옴
+        token_res = await google.post(
+            ENDPOINTS["google_token"],
+            data={
+                "code": code,
+                "client_id": settings.google_client_id,
+                "client_secret": settings.google_client_secret,
+                "redirect_uri": f"{settings.backend_url}/auth/callback/google",
+                "grant_type": "authorization_code",
+            },
+        )
+        token_json = token_res.json()
+        access_token = token_json.get("access_token")
+        if not access_token:
+            return None
+
+        id_token = token_json.get("id_token")
+        email = await _verify_google_id_token(id_token) if id_token else None
+        if email:
+            metrics.incr("oauth.google.id_token")
+            return email
+
+        # Access Token을 사용하여 사용자 정보를 받아옴
+        metrics.incr("oauth.google.userinfo")
+        profile_res = await google.get(
+            ENDPOINTS["google_userinfo"],
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        profile = profile_res.json()
+        if profile.get("email_verified") is False:
+            raise _unverified_email()
+        return profile["email"]
+    except (httpx.HTTPError, ValueError) as e:
+        # 연결 실패나 JSON 이 아닌 응답
+        raise _unavailable() from e
+
+
+async def get_naver_email(code: str, state: str) -> str:
+    """
+    인가 코드로 Access Token 을 받아 네이버 계정 이메일을 조회한다.
+    """
+    try:
+        # 인가 코드는 한 번만 쓸 수 있으므로 요청이 전달되지 않았을 때만 다시 보낸다
+        token_res = await naver.get(
+            ENDPOINTS["naver_token"],
+            idempotent=False,
+            params={
+                "grant_type": "authorization_code",
+                "client_id": settings.naver_client_id,
+                "client_secret": settings.naver_client_secret,
+                "redirect_uri": f"{settings.backend_url}/auth/callback/naver",
+                "code": code,
+                "state": state,
+            },
+            headers={
+                "X-Naver-Client-Id": settings.naver_client_id,
+                "X-Naver-Client-Secret": settings.naver_client_secret,
+            },
+        )
+        access_token = token_res.json().get("access_token")
+
+        profile_res = await naver.get(
+            ENDPOINTS["naver_profile"],
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        return profile_res.json()["response"]["email"]
+    except (httpx.HTTPError, ValueError) as e:
+        raise _unavailable() from e
+
+
+async def get_kakao_email(code: str) -> str:
+    """
+    인가 코드로 Access Token 을 받아 카카오 계정 이메일을 조회한다.
+    """
+    try:
+        token_res = await kakao.post(
+            ENDPOINTS["kakao_token"],
+            data={
+                "grant_type": "authorization_code",
+                "client_id": settings.kakao_client_id,
+                "client_secret": settings.kakao_client_secret,
+                "redirect_uri": f"{settings.backend_url}/auth/callback/kakao",
+                "code": code,
+            },
+        )
+        access_token = token_res.json().get("access_token")
+
+        # 사용자 정보 조회는 GET/POST 모두 지원하며, GET 이어야 실패 시 다시 시도할 수 있다
+        profile_res = await kakao.get(
+            ENDPOINTS["kakao_profile"],
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        return profile_res.json().get("kakao_account")["email"]
+    except (httpx.HTTPError, ValueError) as e:
+        raise _unavailable() from e
+
+
+async def start():
+    await google.start()
+    await google_jwks.start()
+    await naver.start()
+    await kakao.start()
+
+
+async def stop():
+    await google_jwks.stop()
+    await google.stop()
+    await naver.stop()
+    await kakao.stop()
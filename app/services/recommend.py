@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import random
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from app.prisma import prisma
+from app.config import settings
+from app.services.collaborative import ItemSimilarity, cafe_cf, theme_cf
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RecommendPool:
+    """
+    추천 후보(응답 형태로 변환된 dict)를 미리 모아두고 요청마다 무작위로 뽑는다.
+    후보는 주기적으로 다시 적재한다.
+    """
+
+    def __init__(self, name: str, load: Callable[[], Awaitable[List[Dict[str, Any]]]]):
+        self.name = name
+        self._load = load
+        self._items: List[Dict[str, Any]] = []
+        self._ready = False
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        metrics.gauge(f"recommend.{name}.size", lambda: len(self._items))
+
+    async def refresh(self):
+        self._items = await self._load()
+        self._ready = True
+
+    async def sample(self, k: int) -> List[Dict[str, Any]]:
+        if not self._ready:
+            # 첫 요청이 백그라운드 적재보다 먼저 오면 한 번만 적재한다
+            async with self._lock:
+                if not self._ready:
+                    await self.refresh()
+        items = self._items
+        return random.sample(items, min(k, len(items)))
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning("recommend %s refresh failed: %s", self.name, e)
+            await asyncio.sleep(settings.recommend_refresh_interval)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+async def _load_themes() -> List[Dict[str, Any]]:
+    themes = await prisma.theme.find_many(
+        where={
+            "view": {"gte": settings.recommend_min_view},
+            "status": "PUBLISHED",
+        },
+        include={"genre": True},
+    )
+    cafes = await prisma.cafe.find_many(
+        where={"id": {"in": list({theme.cafeId for theme in themes})}},
+    )
+
+    # 테마에 소속된 카페 추가
+    cafes_by_id = {cafe.id: cafe for cafe in cafes}
+    for theme in themes:
+        theme.cafe = cafes_by_id.get(theme.cafeId)
+    return jsonable_encoder(themes)
+
+
+async def _load_cafes() -> List[Dict[str, Any]]:
+    cafes = await prisma.cafe.find_many(
+        where={
+            "view": {"gte": settings.recommend_min_view},
+            "status": "PUBLISHED",
+        },
+    )
+    return jsonable_encoder(cafes)
+
+
+theme_pool = RecommendPool("themes", _load_themes)
+cafe_pool = RecommendPool("cafes", _load_cafes)
+
+
+async def personalize(
+    model: ItemSimilarity, pool: RecommendPool, user_id: str, k: int
+) -> List[Dict[str, Any]]:
+    """
+    사용자의 저장/리뷰 기록으로 추천하고, 모자라면 추천 후보에서 무작위로 채운다.
+    """
+    items = await model.recommend(user_id, k)
+    if len(items) < k:
+        ids = {item["id"] for item in items}
+        fill = [item for item in await pool.sample(k) if item["id"] not in ids]
+        items += fill[: k - len(items)]
+    return items
+
+
+async def start():
+    await theme_pool.start()
+    await cafe_pool.start()
+    await theme_cf.start()
+    await cafe_cf.start()
+
+
+async def stop():
+    await theme_pool.stop()
+    await cafe_pool.stop()
+    await theme_cf.stop()
+    await cafe_cf.stop()
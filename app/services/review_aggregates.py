@@ -0,0 +1,265 @@
+"""
+테마/카페 리뷰 평점 데이터를 테이블마다 GROUP BY 한 번으로 다시 계산하고,
+어긋난 행만 잠근 뒤 다시 확인해 고친다.
+
+    python -m app.services.review_aggregates
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+from prisma import Prisma
+
+from app.prisma import prisma
+from app.services import details as details_service
+from app.services.theme_catalog import theme_catalog
+from app.utils import cache
+
+logger = logging.getLogger(__name__)
+
+# 한 번의 UPDATE 에 넣을 최대 id 수
+UPDATE_CHUNK_SIZE = 200
+
+THEME_REVIEWS_SQL = """
+SELECT `themeId` AS id,
+    COUNT(*) AS reviewsCount,
+    SUM(`rating`) AS reviewsRatingSum,
+    CAST(SUM(`level`) AS SIGNED) AS reviewsLevelSum,
+    CAST(SUM(`level` <> 0) AS SIGNED) AS reviewsLevelCount,
+    CAST(SUM(`fear`) AS SIGNED) AS reviewsFearSum,
+    CAST(SUM(`fear` <> 0) AS SIGNED) AS reviewsFearCount,
+    CAST(SUM(`activity`) AS SIGNED) AS reviewsActivitySum,
+    CAST(SUM(`activity` <> 0) AS SIGNED) AS reviewsActivityCount,
+    CAST(SUM(`success`) AS SIGNED) AS reviewsSuccessCount
+FROM `theme_reviews`
+{where}
+GROUP BY `themeId`
+"""
+
+CAFE_REVIEWS_SQL = """
+SELECT `cafeId` AS id,
+    COUNT(*) AS reviewsCount,
+    SUM(`rating`) AS reviewsRatingSum
+FROM `cafe_reviews`
+{where}
+GROUP BY `cafeId`
+"""
+
+THEME_COLUMNS = (
+    "reviewsCount",
+    "reviewsRatingSum",
+    "reviewsLevelSum",
+    "reviewsLevelCount",
+    "reviewsFearSum",
+    "reviewsFearCount",
+    "reviewsActivitySum",
+    "reviewsActivityCount",
+    "reviewsSuccessCount",
+    "reviewsRating",
+    "reviewsLevel",
+    "reviewsFear",
+    "reviewsActivity",
+    "reviewsStale",
+)
+
+CAFE_COLUMNS = (
+    "reviewsCount",
+    "reviewsRatingSum",
+    "reviewsRating",
+    "reviewsStale",
+)
+
+
+def _average(total: float, count: int) -> float:
+    return total / count if count else 0
+
+
+def _theme_row(sums: Dict[str, Any]) -> Dict[str, Any]:
+    row = {c: sums.get(c) or 0 for c in THEME_COLUMNS[:9]}
+    row["reviewsRating"] = _average(row["reviewsRatingSum"], row["reviewsCount"])
+    for field in ("Level", "Fear", "Activity"):
+        row[f"reviews{field}"] = _average(
+            row[f"reviews{field}Sum"], row[f"reviews{field}Count"]
+        )
+    row["reviewsStale"] = False
+    return row
+
+
+def _cafe_row(sums: Dict[str, Any]) -> Dict[str, Any]:
+    row = {c: sums.get(c) or 0 for c in CAFE_COLUMNS[:2]}
+    row["reviewsRating"] = _average(row["reviewsRatingSum"], row["reviewsCount"])
+    row["reviewsStale"] = False
+    return row
+
+
+def _drifted(current: Dict[str, Any], expected: Dict[str, Any]) -> bool:
+    for column, value in expected.items():
+        if isinstance(value, float):
+            if abs(float(current[column] or 0) - value) > 1e-6:
+                return True
+        elif current[column] != value:
+            return True
+    return False
+
+
+async def _bulk_update(
+    client: Prisma,
+    table: str,
+    columns: Sequence[str],
+    rows: List[Tuple[str, Dict[str, Any]]],
+):
+    """
+    UPDATE ... SET col = CASE id WHEN ? THEN ? ... END 로 여러 행을 한 번에 갱신한다.
+    """
+    for i in range(0, len(rows), UPDATE_CHUNK_SIZE):
+        chunk = rows[i : i + UPDATE_CHUNK_SIZE]
+        cases = " ".join("WHEN ? THEN ?" for _ in chunk)
+        sets = ", ".join(f"`{c}` = CASE `id` {cases} END" for c in columns)
+        placeholders = ", ".join("?" for _ in chunk)
+        args = [v for c in columns for id, row in chunk for v in (id, row[c])]
+        args += [id for id, _ in chunk]
+        await client.execute_raw(
+            f"UPDATE `{table}` SET {sets} WHERE `id` IN ({placeholders})", *args
+        )
+
+
+async def _repair(
+    client: Prisma,
+    table: str,
+    columns: Sequence[str],
+    reviews_sql: str,
+    key: str,
+    build,
+    ids: List[str],
+) -> List[str]:
+    """
+    ids 행들을 잠그고(FOR UPDATE) 리뷰 합계를 다시 읽어 어긋난 행만 고친다. (client 는 트랜잭션)
+
+    잠근 뒤에 읽으므로, 리뷰 쓰기의 변경분은 이 합계에 포함되었거나
+    이 트랜잭션이 끝난 뒤에 고친 값 위로 더해진다.
+    """
+    placeholders = ", ".join("?" for _ in ids)
+    current = await client.query_raw(
+        f"SELECT `id`, {', '.join(f'`{c}`' for c in columns)} FROM `{table}` "
+        f"WHERE `id` IN ({placeholders}) FOR UPDATE",
+        *ids,
+    )
+    sums = {
+        row["id"]: row
+        for row in await client.query_raw(
+            reviews_sql.format(where=f"WHERE `{key}` IN ({placeholders})"), *ids
+        )
+    }
+
+    drifted = []
+    for row in current:
+        expected = build(sums.get(row["id"], {}))
+        if _drifted(row, expected):
+            drifted.append((row["id"], expected))
+    await _bulk_update(client, table, columns, drifted)
+    return [id for id, _ in drifted]
+
+
+async def _recompute(
+    client: Prisma,
+    table: str,
+    columns: Sequence[str],
+    reviews_sql: str,
+    key: str,
+    build,
+) -> Dict[str, Any]:
+    started = time.perf_counter()
+
+    current = await client.query_raw(
+        f"SELECT `id`, {', '.join(f'`{c}`' for c in columns)} FROM `{table}`"
+    )
+    sums = {
+        row["id"]: row for row in await client.query_raw(reviews_sql.format(where=""))
+    }
+    candidates = [
+        row["id"]
+        for row in current
+        if _drifted(row, build(sums.get(row["id"], {})))
+    ]
+
+    # 잠그지 않고 읽는 동안 리뷰가 쓰였을 수 있으므로, 어긋나 보이는 행만 청크마다
+    # 트랜잭션으로 잠그고 다시 확인한다 (한 번에 잠그는 행 수를 줄인다)
+    drifted = []
+    for i in range(0, len(candidates), UPDATE_CHUNK_SIZE):
+        async with client.tx() as tx:
+            drifted += await _repair(
+                tx,
+                table,
+                columns,
+                reviews_sql,
+                key,
+                build,
+                candidates[i : i + UPDATE_CHUNK_SIZE],
+            )
+
+    return {
+        "rows": len(current),
+        "drifted": len(drifted),
+        "ids": drifted,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+async def recompute_themes(client: Prisma = prisma) -> Dict[str, Any]:
+    """
+    모든 테마의 리뷰 평점 데이터를 다시 계산해 어긋난 행만 갱신하고,
+    고친 테마를 카탈로그와 캐시에 반영한다.
+    """
+    result = await _recompute(
+        client, "themes", THEME_COLUMNS, THEME_REVIEWS_SQL, "themeId", _theme_row
+    )
+    for id in result["ids"]:
+        await theme_catalog.refresh_theme(id)
+        await details_service.invalidate_theme(id)
+    return result
+
+
+async def recompute_cafes(client: Prisma = prisma) -> Dict[str, Any]:
+    """
+    모든 카페의 리뷰 평점 데이터를 다시 계산해 어긋난 행만 갱신하고,
+    고친 카페를 카탈로그와 캐시에 반영한다.
+    """
+    result = await _recompute(
+        client, "cafes", CAFE_COLUMNS, CAFE_REVIEWS_SQL, "cafeId", _cafe_row
+    )
+    for id in result["ids"]:
+        await theme_catalog.refresh_cafe(id)
+        await details_service.invalidate_cafe(id)
+    return result
+
+
+async def recompute_all(client: Prisma = prisma) -> Dict[str, Any]:
+    return {
+        "themes": await recompute_themes(client),
+        "cafes": await recompute_cafes(client),
+    }
+
+
+async def main():
+    logging.basicConfig(level=logging.INFO)
+    # 실행 중인 워커들의 캐시 무효화와 카탈로그 갱신은 공유 Redis 를 통해 전달된다
+    await cache.init()
+    await prisma.connect()
+    try:
+        report = await recompute_all()
+    finally:
+        await prisma.disconnect()
+        await cache.close()
+    for table, result in report.items():
+        logger.info(
+            "%s: %d rows, %d drifted, %.3fs",
+            table,
+            result["rows"],
+            result["drifted"],
+            result["seconds"],
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+from typing import Any, Dict, List
+
+from fastapi_cache import FastAPICache
+
+from app.prisma import prisma
+from app.config import settings
+from app.utils import cache
+
+
+def _key(kind: str, user_id: str) -> str:
+    return f"{FastAPICache.get_prefix()}:saves:{kind}:{user_id}"
+
+
+async def get_theme_saves(user_id: str) -> Dict[str, Any]:
+    """
+    사용자가 저장한 테마 id -> ThemeSave 를 캐시에서 읽는다.
+    """
+
+    async def load():
+        saves = await prisma.themesave.find_many(where={"userId": user_id})
+        return {save.themeId: save for save in saves}
+
+    return await cache.get_or_set(
+        _key("theme", user_id), settings.saves_cache_expire, load
+    )
+
+
+async def get_cafe_saves(user_id: str) -> Dict[str, Any]:
+    """
+    사용자가 저장한 카페 id -> CafeSave 를 캐시에서 읽는다.
+    """
+
+    async def load():
+        saves = await prisma.cafesave.find_many(where={"userId": user_id})
+        return {save.cafeId: save for save in saves}
+
+    return await cache.get_or_set(
+        _key("cafe", user_id), settings.saves_cache_expire, load
+    )
+
+
+async def invalidate_theme_saves(user_id: str):
+    await cache.delete(_key("theme", user_id))
+
+
+async def invalidate_cafe_saves(user_id: str):
+    await cache.delete(_key("cafe", user_id))
+
+
+def overlay(item: Dict[str, Any], saves: Dict[str, Any]):
+    """
+    익명 응답(dict)에 사용자의 저장 여부를 saves 필드로 덧붙인다.
+    """
+    if item is not None:
+        save = saves.get(item["id"])
+        item["saves"] = [save] if save else []
+
+
+def overlay_many(items: List[Dict[str, Any]], saves: Dict[str, Any]):
+    for item in items:
+        overlay(item, saves)
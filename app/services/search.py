@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from prisma import models
+
+from app.prisma import prisma
+from app.config import settings
+from app.utils.keyset import (
+    check_cursor_value,
+    decode_cursor,
+    invalid_cursor,
+    seek_sorted,
+)
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    단어별로 글자 1-gram, 2-gram 을 만든다. (예: "비밀의방" -> 비, 밀, ..., 비밀, 밀의, 의방)
+    """
+    tokens = []
+    for word in _WORD.findall(normalize(text)):
+        tokens.extend(word)
+        tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def query_tokens(text: str) -> List[str]:
+    """
+    검색어는 두 글자 이상이면 2-gram, 한 글자면 1-gram 으로 나눈다.
+    """
+    tokens = []
+    for word in _WORD.findall(normalize(text)):
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+    return list(dict.fromkeys(tokens))
+
+
+class SearchIndex:
+    """
+    n-gram 역색인. 필드별 가중치를 둔 BM25 점수로 순위를 매긴다.
+    """
+
+    def __init__(self, weights: Dict[str, float], k1: float = 1.2, b: float = 0.75):
+        self.weights = weights
+        self.k1 = k1
+        self.b = b
+        self.ready = False
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._terms: Dict[str, Counter] = {}
+        self._lengths: Dict[str, float] = {}
+        self._attrs: Dict[str, Dict[str, Any]] = {}
+        self._total_length = 0.0
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def upsert(
+        self, id: str, fields: Dict[str, str], attrs: Optional[Dict[str, Any]] = None
+    ):
+        self.remove(id)
+
+        terms = Counter()
+        for field, text in fields.items():
+            weight = self.weights.get(field, 1.0)
+            for token in tokenize(text):
+                terms[token] += weight
+
+        length = sum(terms.values())
+        for token, tf in terms.items():
+            self._postings.setdefault(token, {})[id] = tf
+        self._terms[id] = terms
+        self._lengths[id] = length
+        self._attrs[id] = attrs or {}
+        self._total_length += length
+
+    def remove(self, id: str):
+        terms = self._terms.pop(id, None)
+        if terms is None:
+            return
+        for token in terms:
+            postings = self._postings[token]
+            del postings[id]
+            if not postings:
+                del self._postings[token]
+        self._total_length -= self._lengths.pop(id)
+        del self._attrs[id]
+
+    def search(
+        self, query: str, where: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        검색어의 n-gram 을 모두 포함하는 문서를 (id, 점수) 내림차순으로 반환한다.
+        """
+        tokens = query_tokens(query)
+        if not tokens or not self._lengths:
+            return []
+
+        postings = [self._postings.get(token, {}) for token in tokens]
+        postings.sort(key=len)
+        if not postings[0]:
+            return []
+
+        n = len(self._lengths)
+        avg_length = self._total_length / n
+        where = {k: v for k, v in (where or {}).items() if v}
+
+        result = []
+        for id in postings[0]:
+            if not all(id in p for p in postings[1:]):
+                continue
+            attrs = self._attrs[id]
+            if any(attrs.get(k) != v for k, v in where.items()):
+                continue
+
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[id] / avg_length)
+            score = 0.0
+            for p in postings:
+                idf = math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5))
+                tf = p[id]
+                score += idf * tf * (self.k1 + 1) / (tf + norm)
+            result.append((id, score))
+
+        result.sort(key=lambda x: (-x[1], x[0]))
+        return result
+
+
+def ranked_page(
+    ranking: List[Tuple[str, float]],
+    take: int,
+    cursor: Optional[str] = None,
+    direction: str = "next",
+) -> List[Tuple[str, float]]:
+    """
+    검색 결과에서 (점수, id) 키셋 커서 다음의 take 개를 자른다.
+    relevance 로 발급한 커서가 아니면(id 만 있는 이전 커서, 다른 정렬의 커서)
+    이어서 조회할 위치를 알 수 없으므로 400 으로 거절한다.
+    """
+    keys = [(-score, id) for id, score in ranking]
+    after = None
+    if cursor:
+        decoded = decode_cursor(cursor)
+        if decoded is None or decoded[0] != "relevance":
+            raise invalid_cursor()
+        check_cursor_value(float, decoded[1])
+        after = (-decoded[1], decoded[2])
+
+    position, step = seek_sorted(keys, after, direction != "prev")
+    page = []
+    while 0 <= position < len(keys) and len(page) < take:
+        score, id = keys[position]
+        page.append((id, -score))
+        position += step
+    return page
+
+
+def order_by_ranking(items: List[Any], ranking: List[Tuple[str, float]]) -> List[Any]:
+    positions = {id: i for i, (id, _) in enumerate(ranking)}
+    return sorted(items, key=lambda x: positions[x.id])
+
+
+def theme_document(theme: models.Theme) -> Dict[str, str]:
+    document = {
+        "displayName": theme.displayName,
+        "genre": " ".join(genre.id for genre in theme.genre or []),
+    }
+    if theme.cafe:
+        document["cafe"] = theme.cafe.name
+        document["area"] = f"{theme.cafe.areaA} {theme.cafe.areaB}"
+    return document
+
+
+def cafe_document(cafe: models.Cafe) -> Dict[str, str]:
+    return {
+        "name": cafe.name,
+        "area": f"{cafe.areaA} {cafe.areaB}",
+    }
+
+
+theme_index = SearchIndex({"displayName": 3.0, "cafe": 2.0, "area": 1.0, "genre": 1.0})
+cafe_index = SearchIndex({"name": 3.0, "area": 1.0})
+faq_index = SearchIndex({"question": 1.0})
+
+_task: Optional[asyncio.Task] = None
+
+
+async def rebuild_cafes():
+    global cafe_index
+    cafes = await prisma.cafe.find_many(where={"status": "PUBLISHED"})
+    index = SearchIndex(cafe_index.weights)
+    for cafe in cafes:
+        index.upsert(
+            cafe.id,
+            cafe_document(cafe),
+            attrs={"areaA": cafe.areaA, "areaB": cafe.areaB},
+        )
+    index.ready = True
+    cafe_index = index
+
+
+async def rebuild_faq():
+    global faq_index
+    faq_list = await prisma.faq.find_many(where={"status": "PUBLISHED"})
+    index = SearchIndex(faq_index.weights)
+    for faq in faq_list:
+        index.upsert(faq.id, {"question": faq.question})
+    index.ready = True
+    faq_index = index
+
+
+def rebuild_themes(themes: List[models.Theme]):
+    """
+    테마 카탈로그가 다시 적재될 때 함께 호출된다.
+    """
+    global theme_index
+    index = SearchIndex(theme_index.weights)
+    for theme in themes:
+        index.upsert(theme.id, theme_document(theme))
+    index.ready = True
+    theme_index = index
+
+
+def index_theme(theme: models.Theme):
+    theme_index.upsert(theme.id, theme_document(theme))
+
+
+def remove_theme(id: str):
+    theme_index.remove(id)
+
+
+def index_cafe(cafe: models.Cafe):
+    cafe_index.upsert(
+        cafe.id,
+        cafe_document(cafe),
+        attrs={"areaA": cafe.areaA, "areaB": cafe.areaB},
+    )
+
+
+def remove_cafe(id: str):
+    cafe_index.remove(id)
+
+
+async def _run():
+    while True:
+        for rebuild in (rebuild_cafes, rebuild_faq):
+            try:
+                await rebuild()
+            except Exception as e:
+                logger.warning("%s failed: %s", rebuild.__name__, e)
+        await asyncio.sleep(settings.search_refresh_interval)
+
+
+async def start():
+    global _task
+    if settings.search_enabled and _task is None:
+        _task = asyncio.create_task(_run())
+
+
+async def stop():
+    global _task
+    if _task:
+        _task.cancel()
+        _task = None
@@ -0,0 +1,164 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from prisma import models
+
+# 수치 특성과 가중치 (표준화한 뒤 곱한다)
+NUMERIC_FEATURES = {
+    "level": 1.0,
+    "fear": 1.0,
+    "activity": 1.0,
+    "lockingRatio": 0.5,
+    "minPerson": 0.5,
+    "maxPerson": 0.5,
+    "price": 0.5,
+    "during": 0.5,
+}
+GENRE_WEIGHT = 1.5
+AREA_A_WEIGHT = 0.5
+AREA_B_WEIGHT = 1.0
+
+
+class SimilarityIndex:
+    """
+    공개된 테마들의 특성 벡터(장르, 지역, 난이도 등)를 행으로 가진 행렬.
+    행은 단위 벡터로 정규화되어 있어 행렬곱 한 번으로 코사인 유사도를 구한다.
+
+    테마 카탈로그가 다시 적재되면 전체를 새로 만들고, 테마 한 개가 바뀌면
+    해당 행만 갱신한다. 처음 보는 장르/지역이 생기면 다음 조회 때 전체를 다시 만든다.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._themes: Dict[str, models.Theme] = {}
+        self._rows: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._free_rows: List[int] = []
+        self._columns: Dict[Tuple[str, str], int] = {}
+        self._mean = np.zeros(len(NUMERIC_FEATURES))
+        self._std = np.ones(len(NUMERIC_FEATURES))
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._active = np.zeros(0, dtype=bool)
+        self._dirty = False
+
+    def __len__(self):
+        return len(self._rows)
+
+    def rebuild(self, themes: List[models.Theme]):
+        columns: Dict[Tuple[str, str], int] = {}
+        offset = len(NUMERIC_FEATURES)
+        for theme in themes:
+            for key in self._categories(theme):
+                columns.setdefault(key, offset + len(columns))
+
+        numeric = np.array(
+            [[getattr(t, f) or 0 for f in NUMERIC_FEATURES] for t in themes],
+            dtype=np.float64,
+        ).reshape(len(themes), len(NUMERIC_FEATURES))
+        mean = numeric.mean(axis=0) if len(themes) else self._mean
+        std = numeric.std(axis=0) if len(themes) else self._std
+        std[std == 0] = 1
+
+        self._columns = columns
+        self._mean = mean
+        self._std = std
+        self._matrix = np.zeros(
+            (len(themes), offset + len(columns)), dtype=np.float32
+        )
+        self._active = np.zeros(len(themes), dtype=bool)
+        self._themes = {}
+        self._rows = {}
+        self._ids = []
+        self._free_rows = []
+        for theme in themes:
+            self._set_row(self._allocate(theme.id), theme)
+            self._themes[theme.id] = theme
+        self._dirty = False
+        self.ready = True
+
+    def upsert(self, theme: models.Theme):
+        if not self.ready:
+            return
+        self._themes[theme.id] = theme
+        if any(key not in self._columns for key in self._categories(theme)):
+            self._dirty = True
+            return
+        row = self._rows.get(theme.id)
+        if row is None:
+            row = self._allocate(theme.id)
+        self._set_row(row, theme)
+
+    def remove(self, id: str):
+        self._themes.pop(id, None)
+        row = self._rows.pop(id, None)
+        if row is None:
+            return
+        self._matrix[row] = 0
+        self._active[row] = False
+        self._ids[row] = None
+        self._free_rows.append(row)
+
+    def similar(self, id: str, k: int) -> Optional[List[Tuple[str, float]]]:
+        """
+        id 와 코사인 유사도가 높은 k 개의 (id, 유사도). 인덱스에 없는 테마면 None.
+        """
+        if self._dirty:
+            self.rebuild(list(self._themes.values()))
+        row = self._rows.get(id)
+        if row is None:
+            return None
+
+        scores = self._matrix @ self._matrix[row]
+        scores[~self._active] = -np.inf
+        scores[row] = -np.inf
+
+        k = min(k, len(self._rows) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self._ids[i], float(scores[i])) for i in top]
+
+    def _categories(self, theme: models.Theme) -> List[Tuple[str, str]]:
+        keys = [("genre", genre.id) for genre in theme.genre or []]
+        if theme.cafe:
+            keys.append(("areaA", theme.cafe.areaA))
+            keys.append(("areaB", f"{theme.cafe.areaA} {theme.cafe.areaB}"))
+        return keys
+
+    def _allocate(self, id: str) -> int:
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._ids[row] = id
+        else:
+            row = len(self._ids)
+            self._ids.append(id)
+            if row >= self._matrix.shape[0]:
+                # 행이 모자라면 두 배로 늘린다
+                size = max(1, row * 2)
+                matrix = np.zeros((size, self._matrix.shape[1]), dtype=np.float32)
+                matrix[:row] = self._matrix
+                active = np.zeros(size, dtype=bool)
+                active[:row] = self._active
+                self._matrix, self._active = matrix, active
+        self._rows[id] = row
+        self._active[row] = True
+        return row
+
+    def _set_row(self, row: int, theme: models.Theme):
+        vector = np.zeros(self._matrix.shape[1], dtype=np.float64)
+        numeric = np.array(
+            [getattr(theme, f) or 0 for f in NUMERIC_FEATURES], dtype=np.float64
+        )
+        weights = np.array(list(NUMERIC_FEATURES.values()))
+        vector[: len(NUMERIC_FEATURES)] = (numeric - self._mean) / self._std * weights
+
+        weight = {"genre": GENRE_WEIGHT, "areaA": AREA_A_WEIGHT, "areaB": AREA_B_WEIGHT}
+        for key in self._categories(theme):
+            vector[self._columns[key]] = weight[key[0]]
+
+        norm = np.linalg.norm(vector)
+        self._matrix[row] = vector / norm if norm else vector
+
+
+theme_similarity = SimilarityIndex()
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from app.prisma import prisma
+from app.config import settings
+from app.utils.etag import make_etag
+
+logger = logging.getLogger(__name__)
+
+# 한 번에 읽어올 행 수
+FETCH_SIZE = 5000
+
+# sitemap 이름 -> (테이블, 프론트 경로)
+SOURCES = {
+    "themes": ("themes", "themes"),
+    "cafes": ("cafes", "cafes"),
+}
+
+URLSET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+URLSET_TAIL = "</urlset>\n"
+INDEX_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+INDEX_TAIL = "</sitemapindex>\n"
+
+
+@dataclass(frozen=True)
+class Sitemap:
+    # gzip 으로 압축된 XML
+    body: bytes
+    last_modified: datetime
+    etag: str
+
+
+def _datetime(value: Any) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class _GzipWriter:
+    """
+    XML 을 조금씩 받아 바로 gzip 으로 압축한다. (압축 전 XML 전체를 들고 있지 않는다)
+    """
+
+    def __init__(self, head: str):
+        self._compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+        self._chunks: List[bytes] = []
+        self.count = 0
+        self.last_modified: Optional[datetime] = None
+        self.write(head)
+
+    def write(self, text: str):
+        self._chunks.append(self._compressor.compress(text.encode()))
+
+    def entry(self, tag: str, loc: str, last_modified: datetime):
+        self.write(
+            f"<{tag}><loc>{escape(loc)}</loc>"
+            f"<lastmod>{last_modified.isoformat()}</lastmod></{tag}>\n"
+        )
+        self.count += 1
+        if self.last_modified is None or last_modified > self.last_modified:
+            self.last_modified = last_modified
+
+    def close(self, tail: str) -> Sitemap:
+        self.write(tail)
+        self._chunks.append(self._compressor.flush())
+        body = b"".join(self._chunks)
+        return Sitemap(
+            body=body,
+            last_modified=self.last_modified or datetime.now(timezone.utc),
+            etag=make_etag(body),
+        )
+
+
+async def _rows(table: str) -> AsyncIterator[Tuple[str, datetime]]:
+    """
+    공개된 행의 (id, updatedAt) 을 id 순서로 FETCH_SIZE 개씩 읽는다.
+    """
+    last_id = ""
+    while True:
+        rows = await prisma.query_raw(
+            f"SELECT id, updatedAt FROM `{table}` "
+            f"WHERE status = 'PUBLISHED' AND id > ? "
+            f"ORDER BY id LIMIT {FETCH_SIZE}",
+            last_id,
+        )
+        for row in rows:
+            yield row["id"], _datetime(row["updatedAt"])
+        if len(rows) < FETCH_SIZE:
+            return
+        last_id = rows[-1]["id"]
+
+
+async def build() -> Dict[str, Sitemap]:
+    """
+    sitemap 조각(최대 sitemap_shard_size 개 URL)들을 만든다.
+    """
+    sitemaps: Dict[str, Sitemap] = {}
+    for name, (table, path) in SOURCES.items():
+        shard = 0
+        writer = None
+        async for id, updated_at in _rows(table):
+            if writer is None:
+                writer = _GzipWriter(URLSET_HEAD)
+            writer.entry("url", f"{settings.front_main_url}/{path}/{id}", updated_at)
+            if writer.count >= settings.sitemap_shard_size:
+                shard += 1
+                sitemaps[f"{name}-{shard}"] = writer.close(URLSET_TAIL)
+                writer = None
+        if writer is not None:
+            shard += 1
+            sitemaps[f"{name}-{shard}"] = writer.close(URLSET_TAIL)
+
+    return sitemaps
+
+
+def build_index(sitemaps: Dict[str, Sitemap], base_url: str) -> Sitemap:
+    """
+    sitemap index. 조각은 index 와 같은 호스트(base_url)에 있어야 하므로 호스트별로 만든다.
+    """
+    index = _GzipWriter(INDEX_HEAD)
+    for name, sitemap in sitemaps.items():
+        index.entry(
+            "sitemap", f"{base_url}/sitemaps/{name}.xml", sitemap.last_modified
+        )
+    return index.close(INDEX_TAIL)
+
+
+class SitemapStore:
+    """
+    미리 만들어 둔 gzip sitemap 들. 주기적으로 다시 만든다.
+    """
+
+    def __init__(self):
+        self._sitemaps: Dict[str, Sitemap] = {}
+        self._indexes: Dict[str, Sitemap] = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self):
+        async with self._lock:
+            self._sitemaps = await build()
+            self._indexes = {}
+
+    async def _ensure(self):
+        if not self._sitemaps:
+            # 첫 요청이 백그라운드 생성보다 먼저 오면 한 번만 만든다
+            async with self._lock:
+                if not self._sitemaps:
+                    self._sitemaps = await build()
+                    self._indexes = {}
+
+    async def get(self, name: str) -> Optional[Sitemap]:
+        await self._ensure()
+        return self._sitemaps.get(name)
+
+    async def get_index(self, base_url: str) -> Sitemap:
+        await self._ensure()
+        index = self._indexes.get(base_url)
+        if index is None:
+            index = self._indexes[base_url] = build_index(self._sitemaps, base_url)
+        return index
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning("sitemap build failed: %s", e)
+            await asyncio.sleep(settings.sitemap_refresh_interval)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+sitemap_store = SitemapStore()
@@ -0,0 +1,379 @@
+import asyncio
+import bisect
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from prisma import models
+
+from app.prisma import prisma
+from app.config import settings
+from app.services import cache_tags
+from app.services import search as search_service
+from app.services.similar import theme_similarity
+from app.utils import cache
+from app.utils.keyset import (
+    check_cursor_value,
+    column_type,
+    decode_cursor,
+    seek_sorted,
+)
+
+logger = logging.getLogger(__name__)
+
+# 인덱스에서 정렬을 지원하는 컬럼 (그 외 컬럼은 Prisma 로 폴백)
+SORT_FIELDS = (
+    "createdAt",
+    "updatedAt",
+    "view",
+    "reviewsRating",
+    "reviewsCount",
+    "blogReviewsCount",
+    "price",
+    "during",
+    "level",
+    "fear",
+    "activity",
+    "lockingRatio",
+    "openDate",
+    "displayName",
+    "name",
+)
+
+
+def level_bucket(value: int, low: Tuple[int, int], high: int) -> Optional[str]:
+    """
+    get_themes 의 fearScore/activity/lockingRatio 구간(hight/low/middle)을 계산한다.
+    """
+    if value >= high:
+        return "hight"
+    if low[0] <= value <= low[1]:
+        return "low"
+    if low[1] < value < high:
+        return "middle"
+    return None
+
+
+def _facets(theme: models.Theme) -> Iterable[Tuple[str, Any]]:
+    yield "cafeId", theme.cafeId
+    if theme.cafe:
+        yield "areaA", theme.cafe.areaA
+        yield "areaB", theme.cafe.areaB
+    for genre in theme.genre or []:
+        yield "genre", genre.id
+    yield "level", theme.level
+    for person in range(max(theme.minPerson, 1), theme.maxPerson + 1):
+        yield "person", person
+    yield "fear", level_bucket(theme.fear, (1, 2), 4)
+    yield "activity", level_bucket(theme.activity, (1, 2), 4)
+    yield "lockingRatio", level_bucket(theme.lockingRatio, (1, 40), 70)
+
+
+class _Index:
+    """
+    공개된 테마들의 패싯별 비트맵(posting)과 정렬 컬럼별 (값, id) 배열
+    """
+
+    def __init__(self):
+        self.themes: Dict[str, models.Theme] = {}
+        self.slots: Dict[str, int] = {}
+        self.ids: Dict[int, str] = {}
+        self.free_slots: List[int] = []
+        self.next_slot = 0
+        self.all = 0
+        self.postings: Dict[str, Dict[Any, int]] = {}
+        self.sorted: Dict[str, List[Tuple[Any, str]]] = {f: [] for f in SORT_FIELDS}
+
+    def add(self, theme: models.Theme):
+        if theme.id in self.themes:
+            self.remove(theme.id)
+
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            slot = self.next_slot
+            self.next_slot += 1
+        bit = 1 << slot
+
+        self.themes[theme.id] = theme
+        self.slots[theme.id] = slot
+        self.ids[slot] = theme.id
+        self.all |= bit
+        for facet, value in _facets(theme):
+            if value is None:
+                continue
+            values = self.postings.setdefault(facet, {})
+            values[value] = values.get(value, 0) | bit
+        for field in SORT_FIELDS:
+            bisect.insort(self.sorted[field], (getattr(theme, field), theme.id))
+
+    def remove(self, id: str):
+        theme = self.themes.pop(id, None)
+        if theme is None:
+            return
+        slot = self.slots.pop(id)
+        del self.ids[slot]
+        bit = 1 << slot
+
+        self.free_slots.append(slot)
+        self.all &= ~bit
+        for facet, value in _facets(theme):
+            values = self.postings.get(facet, {})
+            if value in values:
+                values[value] &= ~bit
+                if not values[value]:
+                    del values[value]
+        for field in SORT_FIELDS:
+            keys = self.sorted[field]
+            key = (getattr(theme, field), theme.id)
+            i = bisect.bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+
+    def ids_in(self, mask: int) -> List[str]:
+        ids = []
+        while mask:
+            low = mask & -mask
+            ids.append(self.ids[low.bit_length() - 1])
+            mask ^= low
+        return ids
+
+
+class ThemeCatalog:
+    """
+    GET /themes 의 필터/정렬/커서 조회를 DB 없이 처리하는 인메모리 카탈로그.
+
+    초기 적재가 끝나기 전(cold)이거나 지원하지 않는 조건이면 find_many 가
+    None 을 반환하고, 호출하는 쪽은 Prisma 로 폴백한다.
+
+    워커마다 카탈로그를 따로 가지므로, 쓰기 후의 refresh_theme/refresh_cafe 는
+    캐시 무효화와 같은 Redis 채널로 다른 워커에도 알려 각자 다시 읽게 한다.
+    """
+
+    def __init__(self):
+        self._index = _Index()
+        self._ready = False
+        self._task: Optional[asyncio.Task] = None
+        # 인덱스 교체/갱신을 순서대로 반영한다 (늦게 읽은 값이 먼저 읽은 값에 덮이지 않도록)
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    async def start(self):
+        if settings.theme_catalog_enabled and self._task is None:
+            cache.subscribe("catalog", self._on_refresh)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.warning("theme catalog rebuild failed: %s", e)
+            await asyncio.sleep(settings.theme_catalog_refresh_interval)
+
+    async def rebuild(self):
+        """
+        공개된 테마 전체를 읽어 인덱스를 새로 만든 뒤 교체한다.
+        """
+        async with self._lock:
+            themes = await prisma.theme.find_many(
+                where={"status": "PUBLISHED"},
+                include={"cafe": True, "genre": True},
+            )
+            index = _Index()
+            for theme in themes:
+                index.add(theme)
+            search_service.rebuild_themes(themes)
+            theme_similarity.rebuild(themes)
+            self._index = index
+            self._ready = True
+
+    async def refresh_theme(self, id: str):
+        """
+        테마 한 개를 다시 읽어 인덱스에 반영하고, 다른 워커에도 반영하도록 알린다.
+        """
+        await self._refresh_theme(id)
+        await cache.broadcast("catalog", theme=id)
+
+    async def refresh_cafe(self, cafe_id: str):
+        """
+        카페에 소속된 테마들을 다시 읽어 인덱스에 반영하고, 다른 워커에도 반영하도록 알린다.
+        """
+        await self._refresh_cafe(cafe_id)
+        await cache.broadcast("catalog", cafe=cafe_id)
+
+    async def _on_refresh(self, message: Dict[str, Any]):
+        """
+        다른 워커가 보낸 refresh_theme/refresh_cafe 를 이 워커의 인덱스에 반영한다.
+
+        보낸 워커가 목록 태그를 무효화한 뒤 이 워커가 반영 전의 카탈로그로 목록
+        페이지를 다시 만들어 L2 에 저장했을 수 있으므로, 반영한 뒤 한 번 더 지운다.
+        (계산 중인 페이지는 무효화 이후에 저장되지 않고 다시 계산된다)
+        """
+        if not self._ready:
+            return
+        tags = [cache_tags.THEME_LIST]
+        if "theme" in message:
+            await self._refresh_theme(message["theme"])
+        if "cafe" in message:
+            await self._refresh_cafe(message["cafe"])
+            # 카페 검색 인덱스도 함께 바뀐다
+            tags.append(cache_tags.CAFE_LIST)
+        await cache.invalidate(*tags)
+
+    async def _refresh_theme(self, id: str):
+        if not self._ready:
+            return
+        async with self._lock:
+            theme = await prisma.theme.find_unique(
+                where={"id": id},
+                include={"cafe": True, "genre": True},
+            )
+            if theme and theme.status == "PUBLISHED":
+                self._index.add(theme)
+                search_service.index_theme(theme)
+                theme_similarity.upsert(theme)
+            else:
+                self._index.remove(id)
+                search_service.remove_theme(id)
+                theme_similarity.remove(id)
+
+    async def _refresh_cafe(self, cafe_id: str):
+        if not self._ready:
+            return
+        async with self._lock:
+            themes = await prisma.theme.find_many(
+                where={"cafeId": cafe_id, "status": "PUBLISHED"},
+                include={"cafe": True, "genre": True},
+            )
+            index = self._index
+            stale = index.postings.get("cafeId", {}).get(cafe_id, 0)
+            for id in index.ids_in(stale):
+                index.remove(id)
+                search_service.remove_theme(id)
+                theme_similarity.remove(id)
+            for theme in themes:
+                index.add(theme)
+                search_service.index_theme(theme)
+                theme_similarity.upsert(theme)
+
+            # 테마와 별개로 카페 자체가 공개 상태일 때만 검색에 노출한다
+            cafe = themes[0].cafe if themes else None
+            if cafe is None:
+                cafe = await prisma.cafe.find_unique(where={"id": cafe_id})
+            if cafe and cafe.status == "PUBLISHED":
+                search_service.index_cafe(cafe)
+            else:
+                search_service.remove_cafe(cafe_id)
+
+    def get(self, id: str) -> Optional[models.Theme]:
+        return self._index.themes.get(id)
+
+    def facet_counts(self, facet: str) -> Optional[Dict[Any, int]]:
+        """
+        패싯 값별 공개 테마 수 (예: 장르별 테마 수). 초기 적재 전이면 None.
+        """
+        if not self._ready:
+            return None
+        postings = self._index.postings.get(facet, {})
+        return {value: bin(mask).count("1") for value, mask in postings.items()}
+
+    def find_many(
+        self,
+        filters: Dict[str, Any],
+        sort: str,
+        order: str,
+        take: int,
+        cursor: Optional[str] = None,
+        direction: str = "next",
+        ranking: Optional[List[Tuple[str, float]]] = None,
+    ) -> Optional[List[models.Theme]]:
+        """
+        get_themes 와 같은 조건으로 테마를 키셋 페이지 단위로 조회한다.
+        처리할 수 없으면 None.
+
+        ranking((id, 점수) 목록)이 주어지면 해당 테마들로 한정하고,
+        sort="relevance" 일 때는 점수 순서대로 반환한다.
+        """
+        if not self._ready or order not in ("asc", "desc"):
+            return None
+        if sort not in SORT_FIELDS and (sort != "relevance" or ranking is None):
+            return None
+
+        index = self._index
+        mask = index.all
+
+        # Prisma where 절의 cafe 조건처럼 areaB > areaA > cafeId 순으로 덮어쓴다
+        cafe_filters = [f for f in ("cafeId", "areaA", "areaB") if filters.get(f)]
+        facets = [f for f in filters if f not in ("cafeId", "areaA", "areaB")]
+        if cafe_filters:
+            facets.append(cafe_filters[-1])
+        for facet in facets:
+            value = filters[facet]
+            if not value:
+                continue
+            if facet in ("fear", "activity", "lockingRatio") and value != "low":
+                value = "hight" if value == "hight" else "middle"
+            mask &= index.postings.get(facet, {}).get(value, 0)
+            if not mask:
+                return []
+
+        if ranking is not None:
+            ranked = 0
+            for id, _ in ranking:
+                if id in index.slots:
+                    ranked |= 1 << index.slots[id]
+            mask &= ranked
+            if not mask:
+                return []
+
+        if sort == "relevance":
+            keys = [(-score, id) for id, score in ranking]
+            ascending = direction != "prev"
+        else:
+            keys = index.sorted[sort]
+            ascending = (order == "asc") != (direction == "prev")
+            # 조건에 맞는 테마가 적으면 비트맵에서 바로 꺼내 정렬한다
+            if bin(mask).count("1") * 8 < len(keys):
+                keys = sorted(
+                    (getattr(index.themes[id], sort), id) for id in index.ids_in(mask)
+                )
+
+        after = None
+        legacy = False
+        if cursor:
+            decoded = decode_cursor(cursor)
+            if decoded and decoded[0] == sort:
+                _, value, id = decoded
+                if sort == "relevance":
+                    check_cursor_value(float, value)
+                    after = (-value, id)
+                else:
+                    check_cursor_value(column_type(models.Theme, sort), value)
+                    after = (value, id)
+            else:
+                id = decoded[2] if decoded else cursor
+                theme = index.themes.get(id)
+                if theme is None or sort == "relevance":
+                    return None
+                after = (getattr(theme, sort), id)
+                legacy = decoded is None
+
+        position, step = seek_sorted(keys, after, ascending, inclusive=legacy)
+        items = []
+        while 0 <= position < len(keys) and len(items) < take:
+            id = keys[position][1]
+            if id in index.slots and (mask >> index.slots[id]) & 1:
+                items.append(index.themes[id])
+            position += step
+        return items
+
+
+theme_catalog = ThemeCatalog()
@@ -0,0 +1,137 @@
+from typing import Optional
+
+from prisma import types
+
+from app.prisma import prisma
+from app.utils.keyset import find_many_keyset, keyset_page
+from app.utils.projection import parse_projection
+from app.services import search as search_service
+from app.services.theme_catalog import theme_catalog
+
+
+async def find_themes(
+    term: Optional[str] = None,
+    cafeId: Optional[str] = None,
+    areaA: Optional[str] = None,
+    areaB: Optional[str] = None,
+    genre: Optional[str] = None,
+    level: Optional[int] = None,
+    person: Optional[int] = None,
+    fearScore: Optional[str] = None,
+    activity: Optional[str] = None,
+    lockingRatio: Optional[str] = None,
+    take: Optional[int] = 20,
+    cursor: Optional[str] = None,
+    direction: Optional[str] = "next",
+    sort: Optional[str] = None,
+    order: Optional[str] = "desc",
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+):
+    """
+    사용자와 무관한(익명) 테마 목록을 조회한다.
+    """
+    # 검색어가 있으면 기본 정렬은 검색 정확도순
+    sort = sort or ("relevance" if term else "createdAt")
+
+    options: types.FindManyThemeArgsFromTheme = {
+        "where": {"status": "PUBLISHED"},
+        "include": {
+            "cafe": True,
+            "genre": True,
+        },
+    }
+
+    # fields/include 가 있으면 필요한 컬럼만 조회한다
+    projection = parse_projection(
+        "Theme",
+        fields,
+        include,
+        default_include=("cafe", "genre"),
+        required=("id", "createdAt", sort),
+    )
+    if projection:
+        options["include"] = projection.include()
+    if term:
+        options["where"]["displayName"] = {"contains": term}
+    if cafeId:
+        options["where"]["cafe"] = {"id": cafeId}
+    if areaA:
+        options["where"]["cafe"] = {"areaA": areaA}
+    if areaB:
+        options["where"]["cafe"] = {"areaB": areaB}
+    if genre:
+        options["where"]["genre"] = {"some": {"id": genre}}
+    if level:
+        options["where"]["level"] = level
+    if person:
+        options["where"]["minPerson"] = {"lte": person}
+        options["where"]["maxPerson"] = {"gte": person}
+    if fearScore:
+        if fearScore == "hight":
+            options["where"]["fear"] = {"gte": 4}
+        elif fearScore == "low":
+            options["where"]["fear"] = {"gte": 1, "lte": 2}
+        else:
+            options["where"]["fear"] = {"gt": 2, "lt": 4}
+    if activity:
+        if activity == "hight":
+            options["where"]["activity"] = {"gte": 4}
+        elif activity == "low":
+            options["where"]["activity"] = {"gte": 1, "lte": 2}
+        else:
+            options["where"]["activity"] = {"gt": 2, "lt": 4}
+    if lockingRatio:
+        if lockingRatio == "hight":
+            options["where"]["lockingRatio"] = {"gte": 70}
+        elif lockingRatio == "low":
+            options["where"]["lockingRatio"] = {"gte": 1, "lte": 40}
+        else:
+            options["where"]["lockingRatio"] = {"gt": 40, "lt": 70}
+
+    # 인메모리 카탈로그와 검색 인덱스에서 먼저 조회한다
+    themes = None
+    ranking = None
+    if term and search_service.theme_index.ready:
+        ranking = search_service.theme_index.search(term)
+    if not term or ranking is not None:
+        themes = theme_catalog.find_many(
+            filters={
+                "cafeId": cafeId,
+                "areaA": areaA,
+                "areaB": areaB,
+                "genre": genre,
+                "level": level,
+                "person": person,
+                "fear": fearScore,
+                "activity": activity,
+                "lockingRatio": lockingRatio,
+            },
+            sort=sort,
+            order=order,
+            take=take + 1,
+            cursor=cursor,
+            direction=direction,
+            ranking=ranking,
+        )
+
+    if themes is None:
+        result = await find_many_keyset(
+            projection.actions(prisma) if projection else prisma.theme,
+            options,
+            sort="createdAt" if sort == "relevance" else sort,
+            order=order,
+            take=take,
+            cursor=cursor,
+            direction=direction,
+        )
+        return result
+
+    key = None
+    if sort == "relevance":
+        scores = dict(ranking)
+        key = lambda theme: scores[theme.id]
+    result = keyset_page(themes, sort, take, cursor, direction, key=key)
+    if projection:
+        result["items"] = [projection.dump(theme) for theme in result["items"]]
+    return result
@@ -1,9 +1,117 @@
+from typing import Any, Dict, Optional
+
+from prisma import Prisma, models
+
 from app.prisma import prisma
+from app.services import details as details_service
+from app.services.theme_catalog import theme_catalog
+
+# 리뷰 한 건의 변경분을 테마의 누적 합계/개수에 더하고 평균을 다시 계산한다.
+# MySQL 은 SET 절을 왼쪽부터 차례로 평가하므로 평균은 갱신된 합계/개수로 계산된다.
+APPLY_DELTA_SQL = """
+UPDATE `themes` SET
+    `reviewsCount` = `reviewsCount` + ?,
+    `reviewsRatingSum` = `reviewsRatingSum` + ?,
+    `reviewsLevelSum` = `reviewsLevelSum` + ?,
+    `reviewsLevelCount` = `reviewsLevelCount` + ?,
+    `reviewsFearSum` = `reviewsFearSum` + ?,
+    `reviewsFearCount` = `reviewsFearCount` + ?,
+    `reviewsActivitySum` = `reviewsActivitySum` + ?,
+    `reviewsActivityCount` = `reviewsActivityCount` + ?,
+    `reviewsSuccessCount` = `reviewsSuccessCount` + ?,
+    `reviewsRating` = IF(`reviewsCount` > 0, `reviewsRatingSum` / `reviewsCount`, 0),
+    `reviewsLevel` = IF(`reviewsLevelCount` > 0, `reviewsLevelSum` / `reviewsLevelCount`, 0),
+    `reviewsFear` = IF(`reviewsFearCount` > 0, `reviewsFearSum` / `reviewsFearCount`, 0),
+    `reviewsActivity` = IF(`reviewsActivityCount` > 0, `reviewsActivitySum` / `reviewsActivityCount`, 0),
+    `reviewsStale` = `reviewsStale` OR LEAST(
+        `reviewsCount`, `reviewsLevelCount`, `reviewsFearCount`,
+        `reviewsActivityCount`, `reviewsSuccessCount`
+    ) < 0
+WHERE `id` = ?
+"""
+
+
+# 같은 리뷰의 동시 수정/삭제가 같은 이전 값으로 변경분을 계산하지 않도록 행을 잠그고 읽는다
+FIND_REVIEW_FOR_UPDATE_SQL = """
+SELECT * FROM `theme_reviews` WHERE `id` = ? AND `userId` = ? FOR UPDATE
+"""
+
+
+async def find_review_for_update(
+    client: Prisma, id: str, userId: str
+) -> Optional[models.ThemeReview]:
+    """
+    리뷰 쓰기 트랜잭션(client)에서 사용자의 리뷰를 잠그고 읽는다.
+    먼저 잠근 트랜잭션이 커밋할 때까지 기다린 뒤 커밋된 값을 읽으므로,
+    변경분은 항상 최신 값에서 계산된다.
+    """
+    return await client.query_first(
+        FIND_REVIEW_FOR_UPDATE_SQL, id, userId, model=models.ThemeReview
+    )
+
+
+def review_delta(
+    old: Optional[models.ThemeReview], new: Optional[models.ThemeReview]
+) -> Dict[str, Any]:
+    """
+    리뷰가 old 에서 new 로 바뀔 때의 합계/개수 변경분 (작성은 old=None, 삭제는 new=None)
+    """
+    delta = {
+        "count": 0,
+        "ratingSum": 0.0,
+        "levelSum": 0,
+        "levelCount": 0,
+        "fearSum": 0,
+        "fearCount": 0,
+        "activitySum": 0,
+        "activityCount": 0,
+        "successCount": 0,
+    }
+    for review, sign in ((old, -1), (new, 1)):
+        if review is None:
+            continue
+        delta["count"] += sign
+        delta["ratingSum"] += sign * review.rating
+        for field in ("level", "fear", "activity"):
+            value = getattr(review, field)
+            if value:
+                delta[f"{field}Sum"] += sign * value
+                delta[f"{field}Count"] += sign
+        if review.success:
+            delta["successCount"] += sign
+    return delta
+
+
+async def apply_review_delta(
+    client: Prisma,
+    themeId: str,
+    old: Optional[models.ThemeReview],
+    new: Optional[models.ThemeReview],
+):
+    """
+    리뷰 쓰기와 같은 트랜잭션(client)에서 테마 평점 데이터를 변경분만큼 갱신한다.
+    """
+    await client.execute_raw(APPLY_DELTA_SQL, *review_delta(old, new).values(), themeId)
+
+
+async def sync_theme_review(themeId: str):
+    """
+    리뷰 쓰기가 커밋된 뒤 카탈로그와 상세 캐시에 반영한다.
+    누적 값이 어긋난 것(stale)이 발견되면 전체 재계산으로 복구한다.
+    """
+    theme = await prisma.theme.find_unique(where={"id": themeId})
+    if theme and theme.reviewsStale:
+        await update_theme_review(themeId)
+        return
+
+    await theme_catalog.refresh_theme(themeId)
+    await details_service.invalidate_theme(themeId)
 
 
 async def update_theme_review(themeId: str):
     """
     테마 리뷰들을 읽어와 평점을 계산하여 테마에 평균 데이터를 업데이트 한다.
+    누적 값이 어긋났을 때 복구하는 용도로 사용한다.
     """
     reviews = await prisma.themereview.find_many(where={"themeId": themeId})
     reviews_count = len(reviews)
@@ -15,6 +123,7 @@ async def update_theme_review(themeId: str):
     reviews_fear_count = 0
     reviews_activity_score = 0
     reviews_activity_count = 0
+    reviews_success_count = 0
     for review in reviews:
         reviews_rating_score += review.rating
         if review.level:
@@ -26,6 +135,8 @@ async def update_theme_review(themeId: str):
         if review.activity:
             reviews_activity_score += review.activity
             reviews_activity_count += 1
+        if review.success:
+            reviews_success_count += 1
 
     reviews_rating = reviews_rating_score / reviews_count if reviews_count else 0
     reviews_level = (
@@ -44,5 +155,16 @@ async def update_theme_review(themeId: str):
             "reviewsFear": reviews_fear,
             "reviewsActivity": reviews_activity,
             "reviewsCount": reviews_count,
+            "reviewsRatingSum": reviews_rating_score,
+            "reviewsLevelSum": reviews_level_score,
+            "reviewsLevelCount": reviews_level_count,
+            "reviewsFearSum": reviews_fear_score,
+            "reviewsFearCount": reviews_fear_count,
+            "reviewsActivitySum": reviews_activity_score,
+            "reviewsActivityCount": reviews_activity_count,
+            "reviewsSuccessCount": reviews_success_count,
+            "reviewsStale": False,
         },
     )
+    await theme_catalog.refresh_theme(themeId)
+    await details_service.invalidate_theme(themeId)
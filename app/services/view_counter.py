@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from app.prisma import prisma
+from app.config import settings
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 한 번의 UPDATE 에 넣을 최대 id 수
+FLUSH_CHUNK_SIZE = 500
+
+
+class ViewCounterBuffer:
+    """
+    상세 페이지 조회수를 메모리에 모았다가 주기적으로(또는 쌓인 id 가 많아지면)
+    UPDATE ... CASE 한 번으로 반영한다.
+    """
+
+    def __init__(self, table: str):
+        self.table = table
+        self._pending: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+        metrics.gauge(f"views.{table}.depth", lambda: len(self._pending))
+
+    def add(self, id: str, count: int = 1):
+        self._pending[id] = self._pending.get(id, 0) + count
+        if len(self._pending) >= settings.view_flush_size and not self._flushing:
+            self._start_flush()
+
+    def _start_flush(self) -> asyncio.Task:
+        """
+        flush 를 별도 작업으로 시작한다. 주기 작업이 취소되어도 flush 는 끝까지 실행되고,
+        stop 이 _flushing 을 기다린다.
+        """
+        self._flushing = asyncio.create_task(self.flush())
+        self._flushing.add_done_callback(self._flushed)
+        return self._flushing
+
+    def _flushed(self, task: asyncio.Task):
+        if self._flushing is task:
+            self._flushing = None
+
+    async def flush(self):
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            items = list(pending.items())
+            done = 0
+            try:
+                for done in range(0, len(items), FLUSH_CHUNK_SIZE):
+                    with metrics.timer(f"views.{self.table}.flush"):
+                        await self._update(items[done : done + FLUSH_CHUNK_SIZE])
+                metrics.incr(f"views.{self.table}.flushed", sum(pending.values()))
+            except Exception as e:
+                # 청크마다 따로 커밋되므로, 실패한 청크부터의 증가분만 다음 flush 때 다시 반영한다
+                logger.warning("%s view flush failed: %s", self.table, e)
+                metrics.incr(f"views.{self.table}.flush_errors")
+                for id, count in items[done:]:
+                    self._pending[id] = self._pending.get(id, 0) + count
+
+    async def _update(self, items):
+        cases = " ".join("WHEN ? THEN ?" for _ in items)
+        placeholders = ", ".join("?" for _ in items)
+        args = [v for item in items for v in item] + [id for id, _ in items]
+        await prisma.execute_raw(
+            f"UPDATE `{self.table}` SET `view` = `view` + CASE `id` {cases} END "
+            f"WHERE `id` IN ({placeholders})",
+            *args,
+        )
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.view_flush_interval)
+            if self._pending or self._flushing:
+                # _pending 에서 꺼낸 조회수가 stop 의 취소로 사라지지 않도록 shield 한다
+                await asyncio.shield(self._flushing or self._start_flush())
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        주기 작업을 멈추고 남은 조회수를 모두 반영한다.
+        """
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        # 진행 중인 flush 가 DB 연결이 끊기기 전에 끝나도록 기다린다
+        if self._flushing:
+            await self._flushing
+        if self._pending:
+            await self.flush()
+
+
+theme_views = ViewCounterBuffer("themes")
+cafe_views = ViewCounterBuffer("cafes")
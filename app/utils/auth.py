@@ -1,14 +1,18 @@
+import asyncio
 import boto3
 import secrets
 import string
+import time
+from concurrent.futures import ThreadPoolExecutor
 from jose import jwt
 from random import randint
-from typing import Union, Any
+from typing import Callable, TypeVar, Union, Any
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 
 from app.config import settings
+from app.utils.metrics import metrics
 
 # to get a string like this run: openssl rand -hex 32
 SECRET_KEY = settings.secret_key
@@ -19,6 +23,15 @@ REGISTER_TOKEN_EXPIRE_DAY = 1
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
+# bcrypt 는 GIL 을 놓고 계산하므로 스레드에서 실행해 이벤트 루프를 막지 않는다
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers, thread_name_prefix="password"
+)
+_password_pending = 0
+metrics.gauge("auth.password.pending", lambda: _password_pending)
+
 
 def generate_code():
     n = 6
@@ -111,6 +124,46 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 
+async def _run_password(name: str, func: Callable[..., T], *args: Any) -> T:
+    """
+    비밀번호 해시/검증을 전용 스레드 풀에서 실행한다.
+    대기 중인 요청이 password_hash_queue_size 이상이면 바로 503 으로 거절한다.
+    """
+    global _password_pending
+    if _password_pending >= settings.password_hash_queue_size:
+        metrics.incr("auth.password.rejected")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="요청이 많습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": "1"},
+        )
+
+    queued = time.perf_counter()
+
+    def run():
+        started = time.perf_counter()
+        metrics.observe("auth.password.wait", started - queued)
+        try:
+            return func(*args)
+        finally:
+            metrics.observe(f"auth.password.{name}", time.perf_counter() - started)
+
+    _password_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, run)
+    finally:
+        _password_pending -= 1
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    return await _run_password("verify", verify_password, password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_password("hash", get_password_hash, password)
+
+
 def create_token(data: dict, expires_delta: Union[timedelta, None] = None):
     to_encode = data.copy()
     if expires_delta:
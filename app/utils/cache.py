@@ -0,0 +1,263 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi_cache import FastAPICache
+from redis import asyncio as aioredis
+
+from app.config import settings
+from app.utils.cache_backend import BoundedMemoryBackend, EventHandler, TieredBackend
+from app.utils.etag import make_etag
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+async def init():
+    """
+    프로세스 내 캐시(L1)와, redis_url 이 있으면 워커/태스크가 공유하는 Redis(L2)로
+    FastAPICache 를 초기화한다.
+    """
+    prefix = f"escapenote-api-cache-{settings.app_env}"
+    backend = BoundedMemoryBackend(
+        max_bytes=settings.cache_max_bytes,
+        namespace_quotas=settings.cache_namespace_quotas,
+    )
+    if settings.redis_url:
+        backend = TieredBackend(
+            l1=backend,
+            redis=aioredis.from_url(settings.redis_url),
+            channel=f"{prefix}:invalidations",
+            l1_expire=settings.cache_l1_expire,
+        )
+        await backend.start()
+    FastAPICache.init(backend, prefix=prefix)
+
+
+async def close():
+    backend = FastAPICache.get_backend()
+    if isinstance(backend, TieredBackend):
+        await backend.stop()
+
+
+def subscribe(event: str, handler: EventHandler):
+    """
+    다른 워커가 broadcast 한 event 를 handler 로 처리한다.
+    Redis(L2) 가 없으면 워커끼리 주고받을 채널이 없으므로 아무것도 하지 않는다.
+    """
+    backend = FastAPICache.get_backend()
+    if isinstance(backend, TieredBackend):
+        backend.subscribe(event, handler)
+
+
+async def broadcast(event: str, **payload: Any):
+    """
+    캐시 무효화와 같은 Redis 채널로 다른 모든 워커에 이벤트를 알린다.
+    """
+    backend = FastAPICache.get_backend()
+    if isinstance(backend, TieredBackend):
+        await backend.publish_event(event, payload)
+
+
+def cache_key(namespace: str, **params: Any) -> str:
+    """
+    네임스페이스와 파라미터로 캐시 키를 만든다. (Authorization 같은 사용자 정보는 넣지 않는다)
+    """
+    digest = hashlib.md5(
+        orjson.dumps(jsonable_encoder(params), option=orjson.OPT_SORT_KEYS)
+    ).hexdigest()
+    return f"{FastAPICache.get_prefix()}:{namespace}:{digest}"
+
+
+def entity_key(namespace: str, id: str, **params: Any) -> str:
+    """
+    id 별로 무효화할 수 있도록 id 를 드러낸 캐시 키를 만든다.
+    """
+    digest = hashlib.md5(
+        orjson.dumps(jsonable_encoder(params), option=orjson.OPT_SORT_KEYS)
+    ).hexdigest()
+    return f"{FastAPICache.get_prefix()}:{namespace}:{id}:{digest}"
+
+
+def tag_key(tag: str) -> str:
+    return f"{FastAPICache.get_prefix()}:tag:{tag}"
+
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(jsonable_encoder(value))
+
+
+# 캐시된 값(jsonable_encoder 결과) -> 태그 목록
+Tags = Callable[[Any], Iterable[str]]
+
+# 같은 키를 계산 중인 작업 (동시에 들어온 미스는 이 작업 하나를 기다린다)
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def _pack(data: bytes, expire: int) -> bytes:
+    """
+    "<fresh_until> <ETag>\n<JSON>" 형식으로 저장한다.
+    """
+    header = f"{time.time() + expire:.3f} {make_etag(data)}"
+    return header.encode() + b"\n" + data
+
+
+def _unpack(stored: bytes) -> Optional[Tuple[float, str, bytes]]:
+    header, _, data = stored.partition(b"\n")
+    try:
+        fresh_until, etag = header.decode().split(" ", 1)
+        return float(fresh_until), etag, data
+    except ValueError:
+        return None
+
+
+async def _compute(
+    key: str,
+    expire: int,
+    stale: int,
+    func: Callable[[], Awaitable[Any]],
+    tags: Optional[Tags],
+) -> bytes:
+    backend = FastAPICache.get_backend()
+    for _ in range(2):
+        started = time.monotonic()
+        value = jsonable_encoder(await func())
+        stored = _pack(orjson.dumps(value), expire)
+        if not tags:
+            await backend.set(key, stored, expire + stale)
+            return stored
+
+        keys = [tag_key(tag) for tag in tags(value)]
+        if not backend.invalidated_since(keys, started):
+            await backend.set(key, stored, expire + stale, tags=keys)
+            return stored
+        # 계산하는 동안 무효화되었으면 이전 데이터일 수 있으므로 다시 계산한다
+        metrics.incr("cache.invalidated_inflight")
+    return stored
+
+
+def _log_refresh_error(task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        logger.warning("cache refresh failed: %s", task.exception())
+        metrics.incr("cache.refresh_errors")
+
+
+def _single_flight(
+    key: str,
+    expire: int,
+    stale: int,
+    func: Callable[[], Awaitable[Any]],
+    tags: Optional[Tags],
+) -> asyncio.Task:
+    task = _inflight.get(key)
+    if task is not None:
+        metrics.incr("cache.coalesced")
+        return task
+
+    task = asyncio.create_task(_compute(key, expire, stale, func, tags))
+    _inflight[key] = task
+    task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return task
+
+
+async def get_or_set_entry(
+    key: str,
+    expire: int,
+    func: Callable[[], Awaitable[Any]],
+    stale: Optional[int] = None,
+    tags: Optional[Tags] = None,
+) -> Tuple[str, bytes]:
+    """
+    캐시에 있으면 (ETag, 직렬화된 JSON bytes) 를, 없으면 func 결과를 직렬화해 저장한 뒤 반환한다.
+    ETag 는 저장할 때 한 번만 계산한다.
+
+    같은 키의 동시 미스는 func 한 번으로 합치고, 만료 후 stale 초 동안은
+    이전 값을 그대로 반환하면서 백그라운드에서 한 번만 다시 계산한다.
+    tags 는 값에 들어있는 엔티티의 태그 목록을 만들며, invalidate 로 해당 항목을 지운다.
+    """
+    if not FastAPICache.get_enable():
+        data = dumps(await func())
+        return make_etag(data), data
+
+    if stale is None:
+        stale = settings.cache_stale_grace
+
+    stored = await FastAPICache.get_backend().get(key)
+    entry = _unpack(stored) if stored is not None else None
+    if entry is None:
+        # 다른 요청이 취소되어도 공유 작업은 끝까지 실행한다
+        entry = _unpack(
+            await asyncio.shield(_single_flight(key, expire, stale, func, tags))
+        )
+    elif entry[0] < time.time():
+        metrics.incr("cache.stale_served")
+        if key not in _inflight:
+            _single_flight(key, expire, stale, func, tags).add_done_callback(
+                _log_refresh_error
+            )
+
+    _, etag, data = entry
+    return etag, data
+
+
+async def get_or_set_bytes(
+    key: str,
+    expire: int,
+    func: Callable[[], Awaitable[Any]],
+    stale: Optional[int] = None,
+    tags: Optional[Tags] = None,
+) -> bytes:
+    """
+    캐시에 있으면 직렬화된 JSON bytes 를, 없으면 func 결과를 직렬화해 저장한 뒤 반환한다.
+    """
+    _, data = await get_or_set_entry(key, expire, func, stale, tags)
+    return data
+
+
+async def get_or_set(
+    key: str,
+    expire: int,
+    func: Callable[[], Awaitable[Any]],
+    stale: Optional[int] = None,
+    tags: Optional[Tags] = None,
+) -> Any:
+    """
+    캐시에 있으면 그 값을, 없으면 func 결과를 직렬화해 저장한 뒤 반환한다.
+    """
+    return orjson.loads(await get_or_set_bytes(key, expire, func, stale, tags))
+
+
+async def invalidate(*tags: str) -> int:
+    """
+    태그가 붙은 캐시 항목들을 모든 워커에서 지운다.
+    """
+    if not FastAPICache.get_enable() or not tags:
+        return 0
+    count = await FastAPICache.get_backend().invalidate_tags(
+        [tag_key(tag) for tag in tags]
+    )
+    metrics.incr("cache.invalidations", count)
+    return count
+
+
+def merge(data: bytes, **fields: Any) -> bytes:
+    """
+    직렬화된 JSON 객체 bytes 에 필드를 덧붙인다. (다시 파싱하지 않는다)
+    """
+    if not data.startswith(b"{"):
+        return data
+    extra = orjson.dumps(jsonable_encoder(fields))
+    if data == b"{}":
+        return extra
+    return data[:-1] + b"," + extra[1:]
+
+
+async def delete(key: str):
+    try:
+        await FastAPICache.get_backend().clear(key=key)
+    except KeyError:
+        pass
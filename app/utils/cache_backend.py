@@ -0,0 +1,407 @@
+import asyncio
+import logging
+import re
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+import orjson
+from fastapi_cache.backends import Backend
+from redis import asyncio as aioredis
+
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Value = Union[str, bytes]
+# 다른 워커가 보낸 이벤트 메시지를 처리하는 핸들러
+EventHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# 태그 무효화 시각을 기억해 둘 시간 (계산 중이던 값이 이보다 오래 걸리진 않는다)
+INVALIDATION_WINDOW = 600  # 10 minutes
+# Redis 의 태그 -> 키 집합 만료 시간 (가장 긴 캐시 만료 시간보다 길어야 한다)
+TAG_EXPIRE = 2 * 86400  # 2 days
+
+
+@dataclass
+class _Entry:
+    value: Value
+    expires_at: float
+    size: int
+    namespace: str
+    tags: Tuple[str, ...] = ()
+
+
+def _namespace(key: str) -> str:
+    """
+    "prefix:namespace:..." 형식의 키에서 네임스페이스를 꺼낸다.
+    """
+    parts = key.split(":", 2)
+    return parts[1] if len(parts) > 2 and parts[1] else "default"
+
+
+def _decode(value: Value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _size(key: str, value: Value) -> int:
+    if isinstance(value, str):
+        value = value.encode()
+    return len(key) + len(value)
+
+
+class BoundedMemoryBackend(Backend):
+    """
+    전체 바이트 예산과 네임스페이스별 한도를 가진 인메모리 LRU 캐시.
+
+    한도를 넘으면 같은 네임스페이스에서, 전체 예산을 넘으면 전체에서 가장 오래
+    사용되지 않은 항목부터 지운다. 만료된 항목은 조회할 때 지운다.
+    항목에 태그를 붙여두면 태그 단위로 지울 수 있다.
+    """
+
+    def __init__(self, max_bytes: int, namespace_quotas: Optional[Dict[str, int]] = None):
+        self.max_bytes = max_bytes
+        self.namespace_quotas = namespace_quotas or {}
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._namespaces: Dict[str, "OrderedDict[str, None]"] = {}
+        self._namespace_bytes: Dict[str, int] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        self._invalidated: Dict[str, float] = {}
+        self.bytes = 0
+
+        metrics.gauge("cache.bytes", lambda: self.bytes)
+        metrics.gauge("cache.entries", lambda: len(self._entries))
+        metrics.gauge("cache.namespace_bytes", lambda: dict(self._namespace_bytes))
+
+    def _get(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            metrics.incr("cache.misses")
+            return None
+        if entry.expires_at < time.time():
+            self._delete(key)
+            metrics.incr("cache.expired")
+            metrics.incr("cache.misses")
+            return None
+
+        self._entries.move_to_end(key)
+        self._namespaces[entry.namespace].move_to_end(key)
+        metrics.incr("cache.hits")
+        return entry
+
+    def _delete(self, key: str) -> _Entry:
+        entry = self._entries.pop(key)
+        keys = self._namespaces[entry.namespace]
+        del keys[key]
+        if not keys:
+            del self._namespaces[entry.namespace]
+        self._namespace_bytes[entry.namespace] -= entry.size
+        if not self._namespace_bytes[entry.namespace]:
+            del self._namespace_bytes[entry.namespace]
+        self.bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return entry
+
+    def _evict(self, key: str):
+        entry = self._delete(key)
+        metrics.incr("cache.evictions")
+        metrics.incr(f"cache.{entry.namespace}.evictions")
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[Value]]:
+        entry = self._get(key)
+        if entry is None:
+            return 0, None
+        return int(entry.expires_at - time.time()), entry.value
+
+    async def get(self, key: str) -> Optional[Value]:
+        entry = self._get(key)
+        return entry.value if entry else None
+
+    async def set(
+        self, key: str, value: Value, expire: int = None, tags: Iterable[str] = ()
+    ):
+        if key in self._entries:
+            self._delete(key)
+
+        namespace = _namespace(key)
+        size = _size(key, value)
+        quota = min(self.namespace_quotas.get(namespace, self.max_bytes), self.max_bytes)
+        if size > quota:
+            # 한도보다 큰 값은 저장하지 않는다
+            metrics.incr("cache.rejected")
+            return
+
+        keys = self._namespaces.setdefault(namespace, OrderedDict())
+        while self._namespace_bytes.get(namespace, 0) + size > quota:
+            self._evict(next(iter(keys)))
+            keys = self._namespaces.setdefault(namespace, OrderedDict())
+        while self.bytes + size > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+        keys = self._namespaces.setdefault(namespace, OrderedDict())
+
+        expires_at = time.time() + expire if expire else float("inf")
+        tags = tuple(tags)
+        self._entries[key] = _Entry(value, expires_at, size, namespace, tags)
+        keys[key] = None
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        self._namespace_bytes[namespace] = self._namespace_bytes.get(namespace, 0) + size
+        self.bytes += size
+        metrics.incr("cache.sets")
+
+    async def clear(self, namespace: str = None, key: str = None) -> int:
+        """
+        namespace 로 시작하는 키들, 또는 key 하나를 지운다.
+        """
+        if namespace:
+            keys = [k for k in self._entries if k.startswith(namespace)]
+            for k in keys:
+                self._delete(k)
+            return len(keys)
+        if key:
+            if key not in self._entries:
+                raise KeyError(key)
+            self._delete(key)
+            return 1
+        return 0
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """
+        태그가 붙은 항목들을 지우고, 무효화 시각을 기록한다.
+        """
+        now = time.monotonic()
+        self._invalidated = {
+            tag: at
+            for tag, at in self._invalidated.items()
+            if at > now - INVALIDATION_WINDOW
+        }
+        count = 0
+        for tag in tags:
+            self._invalidated[tag] = now
+            for key in list(self._tags.get(tag, ())):
+                self._delete(key)
+                count += 1
+        return count
+
+    def invalidated_since(self, tags: Iterable[str], since: float) -> bool:
+        """
+        since(time.monotonic) 이후에 무효화된 태그가 있는지
+        """
+        return any(self._invalidated.get(tag, 0) > since for tag in tags)
+
+
+class TieredBackend(Backend):
+    """
+    프로세스 내 L1(BoundedMemoryBackend) 과 워커/태스크가 공유하는 Redis L2.
+
+    L1 에는 짧게(l1_expire) 만 담아두고, 쓰기/삭제는 Redis pub/sub 으로 알려
+    모든 워커의 L1 에서 지운다. Redis 에 접근할 수 없으면 L1 만으로 동작한다.
+    태그 -> 키 목록은 Redis 집합으로 모든 워커가 공유한다.
+    같은 채널로 캐시 밖의 이벤트(인메모리 카탈로그 갱신 등)도 주고받는다.
+    """
+
+    def __init__(
+        self,
+        l1: BoundedMemoryBackend,
+        redis: aioredis.Redis,
+        channel: str,
+        l1_expire: int,
+    ):
+        self.l1 = l1
+        self.redis = redis
+        self.channel = channel
+        self.l1_expire = l1_expire
+        self._origin = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+        self._handlers: Dict[str, EventHandler] = {}
+        self._events: Set[asyncio.Task] = set()
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[Value]]:
+        ttl, value = await self.l1.get_with_ttl(key)
+        if value is not None:
+            return ttl, value
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                value, ttl = await pipe.get(key).ttl(key).execute()
+        except Exception as e:
+            self._l2_error("get", e)
+            return 0, None
+        if value is None:
+            metrics.incr("cache.l2_misses")
+            return 0, None
+
+        metrics.incr("cache.l2_hits")
+        ttl = max(ttl, 0)
+        await self.l1.set(key, value, min(ttl, self.l1_expire) or self.l1_expire)
+        return ttl, value
+
+    async def get(self, key: str) -> Optional[Value]:
+        _, value = await self.get_with_ttl(key)
+        return value
+
+    async def set(
+        self, key: str, value: Value, expire: int = None, tags: Iterable[str] = ()
+    ):
+        tags = tuple(tags)
+        await self.l1.set(
+            key, value, min(expire or self.l1_expire, self.l1_expire), tags
+        )
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(key, value, ex=expire or None)
+                for tag in tags:
+                    pipe.sadd(tag, key).expire(tag, TAG_EXPIRE)
+                await pipe.execute()
+            await self._publish({"key": key})
+        except Exception as e:
+            self._l2_error("set", e)
+
+    async def clear(self, namespace: str = None, key: str = None) -> int:
+        """
+        L2 에서 지우고 모든 워커의 L1 에도 지우도록 알린다.
+        """
+        count = 0
+        try:
+            if namespace:
+                pattern = re.sub(r"([*?\[\]\\])", r"\\\1", namespace) + "*"
+                keys = []
+                async for k in self.redis.scan_iter(match=pattern, count=1000):
+                    keys.append(k)
+                    if len(keys) >= 1000:
+                        count += await self.redis.unlink(*keys)
+                        keys = []
+                if keys:
+                    count += await self.redis.unlink(*keys)
+                await self._publish({"namespace": namespace})
+            elif key:
+                count = await self.redis.unlink(key)
+                await self._publish({"key": key})
+        except Exception as e:
+            self._l2_error("clear", e)
+        return max(count, await self._clear_l1(namespace, key))
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """
+        Redis 의 태그 집합에 있는 키들을 지우고, 모든 워커에 태그와 키를 알린다.
+        """
+        tags = list(tags)
+        keys: List[str] = []
+        count = 0
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.smembers(tag)
+                members = await pipe.execute()
+            keys = list({_decode(key) for keys in members for key in keys})
+            for i in range(0, len(keys), 1000):
+                count += await self.redis.unlink(*keys[i : i + 1000])
+            if tags:
+                await self.redis.unlink(*tags)
+            await self._publish({"tags": tags, "keys": keys})
+        except Exception as e:
+            self._l2_error("invalidate", e)
+        for key in keys:
+            await self._clear_l1(None, key)
+        return max(count, await self.l1.invalidate_tags(tags))
+
+    def invalidated_since(self, tags: Iterable[str], since: float) -> bool:
+        return self.l1.invalidated_since(tags, since)
+
+    async def _clear_l1(self, namespace: Optional[str], key: Optional[str]) -> int:
+        try:
+            return await self.l1.clear(namespace=namespace, key=key)
+        except KeyError:
+            return 0
+
+    async def _publish(self, message: Dict[str, Any]):
+        message["origin"] = self._origin
+        await self.redis.publish(self.channel, orjson.dumps(message))
+
+    def subscribe(self, event: str, handler: EventHandler):
+        """
+        다른 워커가 publish_event 로 보낸 event 를 handler 로 처리한다.
+        """
+        self._handlers[event] = handler
+
+    async def publish_event(self, event: str, payload: Dict[str, Any]):
+        """
+        다른 모든 워커에 이벤트를 알린다. (보낸 워커 자신은 받지 않는다)
+        """
+        try:
+            await self._publish({**payload, "event": event})
+        except Exception as e:
+            self._l2_error("publish", e)
+
+    def _dispatch(self, data: Dict[str, Any]):
+        handler = self._handlers.get(data["event"])
+        if handler is None:
+            return
+        # 핸들러가 DB 를 읽는 동안에도 캐시 무효화 메시지는 계속 처리한다
+        task = asyncio.create_task(handler(data))
+        self._events.add(task)
+        task.add_done_callback(self._handled)
+
+    def _handled(self, task: asyncio.Task):
+        self._events.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.warning("cache event handler failed: %s", task.exception())
+            metrics.incr("cache.event_errors")
+
+    def _l2_error(self, operation: str, e: Exception):
+        logger.warning("cache l2 %s failed: %s", operation, e)
+        metrics.incr("cache.l2_errors")
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        data = orjson.loads(message["data"])
+                        if data.get("origin") == self._origin:
+                            continue
+                        if "event" in data:
+                            self._dispatch(data)
+                        elif "tags" in data:
+                            for key in data["keys"]:
+                                await self._clear_l1(None, key)
+                            await self.l1.invalidate_tags(data["tags"])
+                        else:
+                            await self._clear_l1(data.get("namespace"), data.get("key"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._l2_error("subscribe", e)
+                await asyncio.sleep(1)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._events):
+            task.cancel()
+        await self.redis.close()
@@ -0,0 +1,140 @@
+import hashlib
+from email.utils import parsedate_to_datetime
+from typing import Any, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# 304 응답에 남겨둘 헤더
+NOT_MODIFIED_HEADERS = (
+    b"etag",
+    b"last-modified",
+    b"cache-control",
+    b"vary",
+    b"expires",
+    b"content-location",
+)
+
+
+def make_etag(data: bytes) -> str:
+    """
+    약한(W/) ETag. 같은 본문이 GZipMiddleware 를 거쳐 gzip 으로도, 그대로도 나가므로
+    바이트 단위로 같음을 보장하는 강한 ETag 를 쓰지 않는다.
+    """
+    return f'W/"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
+
+
+def _opaque(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def version_etag(*parts: Any) -> str:
+    """
+    응답 본문의 ETag 와 본문 밖의 값(로그인 사용자의 저장 여부 등)을 합친 ETag.
+    프로세스마다 따로 증가하는 카운터처럼 워커/재시작 간에 같은 값이 다른 내용을
+    가리킬 수 있는 값은 넣지 않는다.
+    """
+    return make_etag("\x1f".join(str(p) for p in parts).encode())
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match 는 약한 비교(W/ 를 무시)를 한다
+    tags = [_opaque(tag.strip()) for tag in if_none_match.split(",")]
+    return _opaque(etag) in tags
+
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: str) -> bool:
+    if not if_modified_since:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(
+            if_modified_since
+        )
+    except (TypeError, ValueError):
+        return False
+
+
+def is_fresh(
+    request_headers: Headers, etag: Optional[str], last_modified: Optional[str]
+) -> bool:
+    """
+    조건부 요청(If-None-Match 우선, 없으면 If-Modified-Since)에 대해 304 로 답할 수 있는지
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match:
+        return bool(etag) and matches(if_none_match, etag)
+    if last_modified:
+        return not_modified_since(request_headers.get("if-modified-since"), last_modified)
+    return False
+
+
+class ETagMiddleware:
+    """
+    GET/HEAD 의 200 응답에 ETag 를 붙이고, 조건부 요청이면 본문 없이 304 로 답한다.
+
+    핸들러가 ETag 를 직접 넣었으면 그대로 쓰고, 없으면 응답 본문으로 (약한) ETag 를 계산한다.
+    GZipMiddleware 안쪽에 두어 압축 전 본문으로 계산하고, 304 는 압축하지 않게 한다.
+    본문이 여러 조각으로 나뉜(스트리밍) 응답과 이미 인코딩된 응답은 계산하지 않는다.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        start: Optional[Message] = None
+        passthrough = False
+        not_modified = False
+
+        async def send_with_etag(message: Message):
+            nonlocal start, passthrough, not_modified
+            if not_modified:
+                # 304 를 보냈으면 나머지 본문은 버린다
+                return
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                if message["status"] != 200:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            etag = headers.get("etag")
+            if etag is None:
+                if message.get("more_body", False) or "content-encoding" in headers:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                etag = make_etag(message.get("body", b""))
+                headers["ETag"] = etag
+
+            passthrough = True
+            if is_fresh(request_headers, etag, headers.get("last-modified")):
+                not_modified = True
+                raw: List = [
+                    (k, v)
+                    for k, v in start["headers"]
+                    if k.lower() in NOT_MODIFIED_HEADERS
+                ]
+                await send({"type": "http.response.start", "status": 304, "headers": raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Optional
+
+import httpx
+
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 요청이 서버에 도달하지 않은 것이 확실한 오류 (POST 도 다시 보낼 수 있다)
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class HttpClient:
+    """
+    외부 API 하나(provider)를 위한 keep-alive 커넥션 풀과 재시도.
+
+    GET 은 네트워크 오류/타임아웃/5xx 에서, 그 외 메서드는 연결하지 못했을 때만
+    지수 백오프 + jitter 로 다시 시도한다. 지연시간은 http.{name}.latency 로 남긴다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connect_timeout: float,
+        read_timeout: float,
+        retries: int,
+        max_connections: int,
+        backoff: float = 0.1,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.name = name
+        self.retries = retries
+        self.backoff = backoff
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            # startup 전에 호출되면(스크립트 등) 그 자리에서 만든다
+            self._client = self._create()
+        return self._client
+
+    def _create(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=self._timeout, limits=self._limits, transport=self._transport
+        )
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        idempotent: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        idempotent=False 이면 GET 이라도(일회용 인가 코드 교환 등) 연결하지 못했을 때만
+        다시 시도한다. 지정하지 않으면 GET/HEAD 만 idempotent 로 본다.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in ("GET", "HEAD")
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            started = time.perf_counter()
+            try:
+                res = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                self._observe(started)
+                metrics.incr(f"http.{self.name}.errors")
+                if last or not (idempotent or isinstance(e, NOT_SENT_ERRORS)):
+                    raise
+                logger.warning("%s %s %s failed: %r", self.name, method, url, e)
+            else:
+                self._observe(started)
+                if res.status_code < 500 or last or not idempotent:
+                    return res
+                metrics.incr(f"http.{self.name}.errors")
+
+            metrics.incr(f"http.{self.name}.retries")
+            await asyncio.sleep(self.backoff * 2**attempt * random.uniform(0.5, 1.5))
+        raise AssertionError("unreachable")
+
+    def _observe(self, started: float):
+        metrics.observe(f"http.{self.name}.latency", time.perf_counter() - started)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def start(self):
+        if self._client is None:
+            self._client = self._create()
+
+    async def stop(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
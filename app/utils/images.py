@@ -0,0 +1,67 @@
+import io
+from dataclasses import dataclass
+from typing import List, Sequence
+
+from PIL import Image, ImageOps
+
+# 포맷 -> (확장자, Content-Type)
+FORMATS = {
+    "WEBP": ("webp", "image/webp"),
+    "JPEG": ("jpeg", "image/jpeg"),
+}
+
+
+@dataclass(frozen=True)
+class Variant:
+    width: int
+    format: str
+    data: bytes
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """
+    JPEG 로 저장할 수 있도록 투명 영역을 흰 배경으로 채운 RGB 이미지로 바꾼다.
+    """
+    if image.mode == "RGB":
+        return image
+    image = image.convert("RGBA")
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def transcode(
+    path: str, widths: Sequence[int], jpeg_quality: int, webp_quality: int
+) -> List[Variant]:
+    """
+    path 의 이미지를 디코딩해 너비별 WebP/JPEG 를 만든다. (프로세스 풀에서 실행된다)
+
+    EXIF 방향은 픽셀에 반영하고 EXIF/ICC 등 메타데이터는 저장하지 않는다.
+    원본보다 큰 너비는 만들지 않으며, 원본이 가장 작은 너비보다 작으면 원본 크기로 하나만 만든다.
+    잘못된 이미지면 PIL.UnidentifiedImageError 등 예외가 발생한다.
+    """
+    image = Image.open(path)
+    # JPEG 는 필요한 크기에 가깝게 축소하며 디코딩한다
+    image.draft("RGB", (max(widths), max(widths)))
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        # LA/PA 와 투명색이 있는 팔레트 이미지는 WebP 에서 투명도를 유지한다
+        alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if alpha else "RGB")
+
+    targets = sorted({w for w in widths if w <= image.width}) or [image.width]
+    variants = []
+    for width in targets:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        resized.save(buffer, "WEBP", quality=webp_quality, method=4)
+        variants.append(Variant(width, "WEBP", buffer.getvalue()))
+
+        buffer = io.BytesIO()
+        _flatten(resized).save(
+            buffer, "JPEG", quality=jpeg_quality, optimize=True, progressive=True
+        )
+        variants.append(Variant(width, "JPEG", buffer.getvalue()))
+    return variants
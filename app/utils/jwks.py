@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Dict, Optional
+
+from jose import jwk
+from jose.backends.base import Key
+
+from app.utils.http_client import HttpClient
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Cache-Control 에 max-age 가 없을 때 키 목록을 다시 받는 주기
+DEFAULT_MAX_AGE = 3600  # 1 hour
+# 모르는 kid 때문에 다시 받는 것은 이 간격보다 자주 하지 않는다
+MIN_REFRESH_INTERVAL = 60  # 1 minute
+
+
+def _max_age(cache_control: str) -> int:
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    return int(match.group(1)) if match else DEFAULT_MAX_AGE
+
+
+class JwksCache:
+    """
+    JWKS(공개키 목록)를 kid 별로 들고 있다가, 만료 전에 백그라운드에서 다시 받는다.
+
+    처음 보는 kid 가 오면(키 교체) 바로 한 번 다시 받아 확인한다.
+    공개키는 받을 때 한 번만 파싱해 둔다.
+    """
+
+    def __init__(self, name: str, client: HttpClient, url: str):
+        self.name = name
+        self.url = url
+        self._client = client
+        self._keys: Dict[str, Key] = {}
+        self._fetched_at = 0.0
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        metrics.gauge(f"jwks.{name}.keys", lambda: len(self._keys))
+
+    async def refresh(self):
+        res = await self._client.get(self.url)
+        res.raise_for_status()
+        keys = {
+            key["kid"]: jwk.construct(key, key.get("alg", "RS256"))
+            for key in res.json()["keys"]
+        }
+
+        now = time.monotonic()
+        self._keys = keys
+        self._fetched_at = now
+        self._expires_at = now + _max_age(res.headers.get("cache-control"))
+        metrics.incr(f"jwks.{self.name}.refreshes")
+
+    async def get_key(self, kid: str) -> Optional[Key]:
+        now = time.monotonic()
+        if kid not in self._keys or now >= self._expires_at:
+            async with self._lock:
+                now = time.monotonic()
+                expired = now >= self._expires_at
+                rotated = (
+                    kid not in self._keys
+                    and now - self._fetched_at >= MIN_REFRESH_INTERVAL
+                )
+                if expired or rotated:
+                    await self.refresh()
+        return self._keys.get(kid)
+
+    async def _run(self):
+        while True:
+            try:
+                async with self._lock:
+                    await self.refresh()
+                # 만료되기 조금 전에 다시 받는다
+                delay = (self._expires_at - time.monotonic()) * 0.9
+            except Exception as e:
+                logger.warning("jwks %s refresh failed: %s", self.name, e)
+                delay = MIN_REFRESH_INTERVAL
+            await asyncio.sleep(max(delay, MIN_REFRESH_INTERVAL))
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
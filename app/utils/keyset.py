@@ -0,0 +1,184 @@
+import base64
+import bisect
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import orjson
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter, ValidationError
+
+# 커서: (정렬 컬럼, 정렬 값, id) 를 base64 로 감싼 불투명한 문자열
+Cursor = Tuple[str, Any, str]
+
+
+def encode_cursor(sort: str, value: Any, id: str) -> str:
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    data = orjson.dumps([sort, value, id])
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Cursor]:
+    """
+    커서를 (정렬 컬럼, 정렬 값, id) 로 되돌린다. 예전 형식(id 만 있는 커서)이면 None.
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort, value, id = orjson.loads(data)
+        if isinstance(value, dict) and "dt" in value:
+            value = datetime.fromisoformat(value["dt"])
+    except Exception:
+        return None
+    if not isinstance(sort, str) or not isinstance(id, str):
+        return None
+    return sort, value, id
+
+
+def invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="잘못된 커서입니다.",
+    )
+
+
+@lru_cache(maxsize=256)
+def _adapter(annotation: Any) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def check_cursor_value(annotation: Any, value: Any):
+    """
+    커서의 정렬 값이 정렬 컬럼 타입(annotation)과 맞지 않으면(조작된 커서) 400.
+    """
+    try:
+        _adapter(annotation).validate_python(value, strict=True)
+    except ValidationError:
+        raise invalid_cursor()
+
+
+def column_type(model: Any, field: str) -> Any:
+    info = model.model_fields.get(field)
+    return info.annotation if info else Any
+
+
+def seek_where(
+    sort: str, value: Any, id: str, ascending: bool, inclusive: bool = False
+) -> Dict[str, Any]:
+    """
+    WHERE (sort, id) > (value, id) (ascending=False 이면 <, inclusive 이면 >=/<=) 조건
+    """
+    op = "gt" if ascending else "lt"
+    id_op = op + "e" if inclusive else op
+    if sort == "id":
+        return {"id": {id_op: id}}
+    return {
+        "OR": [
+            {sort: {op: value}},
+            {sort: value, "id": {id_op: id}},
+        ]
+    }
+
+
+def keyset_page(
+    items: List[Any],
+    sort: str,
+    take: int,
+    cursor: Optional[str] = None,
+    direction: str = "next",
+    key: Optional[Callable[[Any], Any]] = None,
+):
+    """
+    take + 1 개를 조회한 결과로 페이지와 pageInfo 를 만든다.
+
+    direction="prev" 이면 items 는 역순으로 조회된 상태여야 한다.
+    """
+    key = key or (lambda item: getattr(item, sort))
+    has_more = len(items) > take
+    items = items[:take]
+    if direction == "prev":
+        items.reverse()
+        has_next, has_previous = bool(cursor), has_more
+    else:
+        has_next, has_previous = has_more, bool(cursor)
+
+    start_cursor = end_cursor = None
+    if items:
+        first, last = items[0], items[-1]
+        if has_previous:
+            start_cursor = encode_cursor(sort, key(first), first.id)
+        if has_next:
+            end_cursor = encode_cursor(sort, key(last), last.id)
+
+    return {
+        "pageInfo": {
+            "startCursor": start_cursor,
+            "endCursor": end_cursor,
+            "hasPreviousPage": has_previous,
+            "hasNextPage": has_next,
+        },
+        "items": items,
+    }
+
+
+def seek_sorted(
+    keys: List[Tuple[Any, str]],
+    after: Optional[Tuple[Any, str]],
+    ascending: bool,
+    inclusive: bool = False,
+) -> Tuple[int, int]:
+    """
+    (값, id) 오름차순 배열에서 after 다음 위치(inclusive 이면 after 위치부터)와
+    이동 방향(step)을 구한다.
+    """
+    if ascending:
+        if not after:
+            return 0, 1
+        seek = bisect.bisect_left if inclusive else bisect.bisect_right
+        return seek(keys, after), 1
+    if not after:
+        return len(keys) - 1, -1
+    seek = bisect.bisect_right if inclusive else bisect.bisect_left
+    return seek(keys, after) - 1, -1
+
+
+async def find_many_keyset(
+    actions: Any,
+    options: Dict[str, Any],
+    sort: str,
+    order: str,
+    take: int,
+    cursor: Optional[str] = None,
+    direction: str = "next",
+):
+    """
+    (정렬 값, id) 키셋 조건으로 find_many 를 실행하고 페이지를 반환한다.
+    """
+    ascending = (order == "asc") != (direction == "prev")
+
+    if cursor:
+        decoded = decode_cursor(cursor)
+        if decoded and decoded[0] == sort:
+            _, value, id = decoded
+            # actions 가 다루는 Prisma 모델(부분 모델 포함)의 컬럼 타입과 비교한다
+            check_cursor_value(column_type(actions._model, sort), value)
+        else:
+            # 예전 형식 커서이거나 정렬이 바뀐 경우 해당 행의 정렬 값을 읽어온다
+            id = decoded[2] if decoded else cursor
+            row = await actions.find_unique(where={"id": id})
+            if row is None:
+                return keyset_page([], sort, take, cursor, direction)
+            value = getattr(row, sort)
+        # 예전 커서는 다음 페이지의 첫 행을 가리키므로 그 행부터 포함한다
+        seek = seek_where(sort, value, id, ascending, inclusive=decoded is None)
+        where = options.get("where")
+        options["where"] = {"AND": [where, seek]} if where else seek
+
+    options["take"] = take + 1
+    options["order"] = [{sort: "asc" if ascending else "desc"}]
+    if sort != "id":
+        options["order"].append({"id": "asc" if ascending else "desc"})
+    options.pop("cursor", None)
+
+    items = await actions.find_many(**options)
+    return keyset_page(items, sort, take, cursor, direction)
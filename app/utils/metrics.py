@@ -0,0 +1,68 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict
+
+
+class _Timing:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "max_ms": self.max * 1000,
+        }
+
+
+class Metrics:
+    """
+    프로세스 내 간단한 카운터/게이지/지연시간 집계. GET /metrics 로 노출된다.
+    """
+
+    def __init__(self):
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+        self._timings: Dict[str, _Timing] = {}
+
+    def incr(self, name: str, value: float = 1):
+        self._counters[name] = self._counters.get(name, 0) + value
+
+    def gauge(self, name: str, func: Callable[[], Any]):
+        """
+        스냅샷 시점에 func() 값을 읽는 게이지를 등록한다.
+        """
+        self._gauges[name] = func
+
+    def observe(self, name: str, seconds: float):
+        timing = self._timings.get(name)
+        if timing is None:
+            timing = self._timings[name] = _Timing()
+        timing.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "counters": dict(self._counters),
+            "gauges": {name: func() for name, func in self._gauges.items()},
+            "timings": {name: t.snapshot() for name, t in self._timings.items()},
+        }
+
+
+metrics = Metrics()
@@ -0,0 +1,179 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, get_args
+
+from fastapi import HTTPException, status
+from pydantic import create_model
+from prisma import bases, models
+
+# 모델별 관계 필드: (관계 모델, 목록 여부)
+# saves 는 모든 사용자의 저장 기록이므로 열지 않는다 (로그인 사용자 본인 것만 따로 덧붙인다)
+RELATIONS = {
+    "Theme": {
+        "cafe": ("Cafe", False),
+        "genre": ("Genre", True),
+        "reviews": ("ThemeReview", True),
+    },
+    "Cafe": {
+        "themes": ("Theme", True),
+    },
+}
+
+# 목록(카드) 화면에 필요한 컬럼
+CARD_FIELDS = {
+    "Theme": (
+        "id",
+        "cafeId",
+        "name",
+        "displayName",
+        "thumbnail",
+        "price",
+        "lockingRatio",
+        "during",
+        "minPerson",
+        "maxPerson",
+        "level",
+        "fear",
+        "activity",
+        "reviewsRating",
+        "reviewsCount",
+        "view",
+        "status",
+        "createdAt",
+        "updatedAt",
+    ),
+    "Cafe": (
+        "id",
+        "areaA",
+        "areaB",
+        "name",
+        "addressLine",
+        "reviewsRating",
+        "reviewsCount",
+        "view",
+        "status",
+        "createdAt",
+        "updatedAt",
+    ),
+    "Genre": ("id",),
+}
+
+
+def _is_relation(annotation: Any) -> bool:
+    if hasattr(annotation, "__prisma_model__"):
+        return True
+    return any(_is_relation(arg) for arg in get_args(annotation))
+
+
+def scalar_fields(model: str) -> Tuple[str, ...]:
+    fields = getattr(models, model).model_fields
+    return tuple(f for f, info in fields.items() if not _is_relation(info.annotation))
+
+
+@dataclass(frozen=True)
+class Projection:
+    """
+    조회할 컬럼과 관계(각 관계의 컬럼 포함). Prisma 부분 모델로 변환되어 select 처럼 동작한다.
+    """
+
+    model: str
+    fields: Tuple[str, ...]
+    relations: Tuple[Tuple[str, "Projection"], ...] = ()
+
+    def with_relation(self, name: str) -> "Projection":
+        if name in dict(self.relations):
+            return self
+        target, _ = RELATIONS[self.model][name]
+        relation = Projection(target, CARD_FIELDS.get(target, scalar_fields(target)))
+        return Projection(self.model, self.fields, self.relations + ((name, relation),))
+
+    def include(self) -> Dict[str, Any]:
+        return {name: True for name, _ in self.relations}
+
+    def partial_model(self) -> Type[Any]:
+        return _partial_model(self)
+
+    def actions(self, client: Any) -> Any:
+        return self.partial_model().prisma(client)
+
+    def dump(self, item: Any) -> Dict[str, Any]:
+        """
+        전체 모델(인메모리 카탈로그 등)을 프로젝션된 dict 로 바꾼다.
+        """
+        data = {f: getattr(item, f) for f in self.fields}
+        for name, relation in self.relations:
+            value = getattr(item, name, None)
+            if isinstance(value, list):
+                data[name] = [relation.dump(v) for v in value]
+            elif value is not None:
+                data[name] = relation.dump(value)
+            else:
+                data[name] = None
+        return data
+
+
+@lru_cache(maxsize=256)
+def _partial_model(projection: Projection) -> Type[Any]:
+    model = getattr(models, projection.model)
+    definitions = {}
+    for field in projection.fields:
+        annotation = model.model_fields[field].annotation
+        definitions[field] = (Optional[annotation], None)
+    for name, relation in projection.relations:
+        partial = _partial_model(relation)
+        _, many = RELATIONS[projection.model][name]
+        annotation = List[partial] if many else partial
+        definitions[name] = (Optional[annotation], None)
+
+    return create_model(
+        f"{projection.model}Projection{abs(hash(projection))}",
+        __base__=getattr(bases, f"Base{projection.model}"),
+        **definitions,
+    )
+
+
+def _split(value: str) -> List[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def parse_projection(
+    model: str,
+    fields: Optional[str],
+    include: Optional[str],
+    default_include: Sequence[str] = (),
+    required: Sequence[str] = ("id",),
+) -> Optional[Projection]:
+    """
+    fields=card 또는 fields=id,name,... / include=cafe,genre 쿼리 파라미터를 해석한다.
+    둘 다 없으면 None (전체 컬럼과 기본 관계를 그대로 조회).
+    """
+    if fields is None and include is None:
+        return None
+
+    available = scalar_fields(model)
+    if fields is None or fields == "card":
+        names = list(CARD_FIELDS.get(model, available))
+    else:
+        names = _split(fields)
+    unknown = [f for f in names if f not in available]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"조회할 수 없는 필드입니다: {', '.join(unknown)}",
+        )
+    for field in required:
+        if field in available and field not in names:
+            names.append(field)
+
+    relations = _split(include) if include is not None else list(default_include)
+    unknown = [r for r in relations if r not in RELATIONS.get(model, {})]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"포함할 수 없는 관계입니다: {', '.join(unknown)}",
+        )
+
+    projection = Projection(model, tuple(dict.fromkeys(names)))
+    for relation in relations:
+        projection = projection.with_relation(relation)
+    return projection
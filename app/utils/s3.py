@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Dict, Optional
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class S3Bucket:
+    """
+    버킷 하나에 올리는 오래 유지되는 S3 클라이언트.
+
+    boto3 업로드는 blocking 이므로 크기가 정해진 스레드 풀에서 실행한다.
+    파일 객체에서 조금씩 읽어 올리며, multipart_threshold 보다 크면 multipart 로 올린다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        endpoint_url: Optional[str],
+        workers: int,
+        multipart_threshold: int,
+        multipart_chunksize: int,
+    ):
+        self.name = name
+        self.endpoint_url = endpoint_url or None
+        self.workers = workers
+        self._transfer = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+        )
+        self._client = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+
+        metrics.gauge("s3.pending", lambda: self._pending)
+
+    def _create(self):
+        # 업로드 스레드마다 multipart 파트를 동시에 올리므로 커넥션 풀을 그만큼 잡는다
+        pool = self.workers * self._transfer.max_request_concurrency
+        return boto3.session.Session().client(
+            "s3",
+            endpoint_url=self.endpoint_url,
+            config=Config(max_pool_connections=pool, retries={"mode": "standard"}),
+        )
+
+    async def start(self):
+        if self._client is None:
+            self._client = self._create()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="s3"
+            )
+
+    async def stop(self):
+        if self._executor is not None:
+            # 진행 중인 업로드는 끝까지 올린다
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+
+    def _upload(self, fileobj: BinaryIO, key: str, extra_args: Dict[str, Any]) -> int:
+        fileobj.seek(0, os.SEEK_END)
+        size = fileobj.tell()
+        fileobj.seek(0)
+        self._client.upload_fileobj(
+            fileobj, self.name, key, ExtraArgs=extra_args, Config=self._transfer
+        )
+        return size
+
+    async def upload(self, fileobj: BinaryIO, key: str, **extra_args: Any) -> int:
+        """
+        fileobj 를 key 로 올리고 올린 바이트 수를 반환한다.
+        extra_args 는 ContentType, CacheControl 같은 boto3 ExtraArgs 이다.
+        """
+        await self.start()
+        self._pending += 1
+        started = time.perf_counter()
+        try:
+            size = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._upload, fileobj, key, extra_args
+            )
+        except Exception:
+            metrics.incr("s3.upload_errors")
+            raise
+        finally:
+            self._pending -= 1
+            metrics.observe("s3.upload", time.perf_counter() - started)
+
+        metrics.incr("s3.uploads")
+        metrics.incr("s3.upload_bytes", size)
+        return size
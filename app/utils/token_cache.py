@@ -0,0 +1,74 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from app.models.auth import AccessUser
+from app.utils.metrics import metrics
+
+
+class TokenCache:
+    """
+    검증을 마친 토큰(digest) -> AccessUser 를 토큰의 exp 까지 기억하는 LRU.
+
+    토큰 원문 대신 digest 를 키로 쓰고, 사용자별로 지울 수 있도록 사용자 -> digest 도 관리한다.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[AccessUser, float]]" = OrderedDict()
+        self._users: Dict[str, Set[bytes]] = {}
+
+        metrics.gauge("auth.token_cache.size", lambda: len(self._entries))
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def _delete(self, digest: bytes):
+        user, _ = self._entries.pop(digest)
+        digests = self._users.get(user.id)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._users[user.id]
+
+    def get(self, token: str) -> Optional[AccessUser]:
+        digest = self._digest(token)
+        entry = self._entries.get(digest)
+        if entry is None:
+            metrics.incr("auth.token_cache.misses")
+            return None
+        user, expires_at = entry
+        if expires_at <= time.time():
+            self._delete(digest)
+            metrics.incr("auth.token_cache.expired")
+            metrics.incr("auth.token_cache.misses")
+            return None
+
+        self._entries.move_to_end(digest)
+        metrics.incr("auth.token_cache.hits")
+        return user
+
+    def put(self, token: str, user: AccessUser, expires_at: Optional[float]):
+        if not expires_at or self.max_entries <= 0:
+            # 만료 시간이 없는 토큰은 캐시하지 않는다
+            return
+        digest = self._digest(token)
+        if digest in self._entries:
+            self._delete(digest)
+        while len(self._entries) >= self.max_entries:
+            self._delete(next(iter(self._entries)))
+            metrics.incr("auth.token_cache.evictions")
+
+        self._entries[digest] = (user, float(expires_at))
+        self._users.setdefault(user.id, set()).add(digest)
+
+    def revoke_user(self, user_id: str) -> int:
+        """
+        사용자의 캐시된 토큰을 모두 지운다. (로그아웃)
+        """
+        digests = list(self._users.get(user_id, ()))
+        for digest in digests:
+            self._delete(digest)
+        return len(digests)
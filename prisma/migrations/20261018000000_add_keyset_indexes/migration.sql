@@ -0,0 +1,29 @@
+-- CreateIndex
+CREATE INDEX `cafes_status_createdAt_id_idx` ON `cafes`(`status`, `createdAt`, `id`);
+
+-- CreateIndex
+CREATE INDEX `themes_status_createdAt_id_idx` ON `themes`(`status`, `createdAt`, `id`);
+
+-- CreateIndex
+CREATE INDEX `themes_status_view_id_idx` ON `themes`(`status`, `view`, `id`);
+
+-- CreateIndex
+CREATE INDEX `themes_status_reviewsRating_id_idx` ON `themes`(`status`, `reviewsRating`, `id`);
+
+-- CreateIndex
+CREATE INDEX `theme_reviews_themeId_createdAt_id_idx` ON `theme_reviews`(`themeId`, `createdAt`, `id`);
+
+-- CreateIndex
+CREATE INDEX `theme_reviews_userId_createdAt_id_idx` ON `theme_reviews`(`userId`, `createdAt`, `id`);
+
+-- CreateIndex
+CREATE INDEX `cafe_reviews_cafeId_createdAt_id_idx` ON `cafe_reviews`(`cafeId`, `createdAt`, `id`);
+
+-- CreateIndex
+CREATE INDEX `cafe_reviews_userId_createdAt_id_idx` ON `cafe_reviews`(`userId`, `createdAt`, `id`);
+
+-- CreateIndex
+CREATE INDEX `blog_reviews_themeId_createdAt_id_idx` ON `blog_reviews`(`themeId`, `createdAt`, `id`);
+
+-- CreateIndex
+CREATE INDEX `blog_reviews_cafeId_createdAt_id_idx` ON `blog_reviews`(`cafeId`, `createdAt`, `id`);
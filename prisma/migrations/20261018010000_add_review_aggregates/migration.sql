@@ -0,0 +1,46 @@
+-- AlterTable
+ALTER TABLE `cafes` ADD COLUMN `reviewsRatingSum` DOUBLE NOT NULL DEFAULT 0.0,
+    ADD COLUMN `reviewsStale` BOOLEAN NOT NULL DEFAULT false;
+
+-- AlterTable
+ALTER TABLE `themes` ADD COLUMN `reviewsRatingSum` DOUBLE NOT NULL DEFAULT 0.0,
+    ADD COLUMN `reviewsLevelSum` INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN `reviewsLevelCount` INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN `reviewsFearSum` INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN `reviewsFearCount` INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN `reviewsActivitySum` INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN `reviewsActivityCount` INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN `reviewsSuccessCount` INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN `reviewsStale` BOOLEAN NOT NULL DEFAULT false;
+
+-- Backfill
+UPDATE `cafes` c
+JOIN (
+    SELECT `cafeId`, SUM(`rating`) AS ratingSum
+    FROM `cafe_reviews`
+    GROUP BY `cafeId`
+) r ON r.`cafeId` = c.`id`
+SET c.`reviewsRatingSum` = r.ratingSum;
+
+UPDATE `themes` t
+JOIN (
+    SELECT `themeId`,
+        SUM(`rating`) AS ratingSum,
+        SUM(`level`) AS levelSum,
+        SUM(`level` <> 0) AS levelCount,
+        SUM(`fear`) AS fearSum,
+        SUM(`fear` <> 0) AS fearCount,
+        SUM(`activity`) AS activitySum,
+        SUM(`activity` <> 0) AS activityCount,
+        SUM(`success`) AS successCount
+    FROM `theme_reviews`
+    GROUP BY `themeId`
+) r ON r.`themeId` = t.`id`
+SET t.`reviewsRatingSum` = r.ratingSum,
+    t.`reviewsLevelSum` = r.levelSum,
+    t.`reviewsLevelCount` = r.levelCount,
+    t.`reviewsFearSum` = r.fearSum,
+    t.`reviewsFearCount` = r.fearCount,
+    t.`reviewsActivitySum` = r.activitySum,
+    t.`reviewsActivityCount` = r.activityCount,
+    t.`reviewsSuccessCount` = r.successCount;